@@ -0,0 +1,130 @@
+import os
+import ast
+import sys
+import json
+import time
+import multiprocessing
+from functools import lru_cache
+
+import z3
+import astor
+
+# inputs of a type nothing else is known about
+DEFAULTS = {'int': 0, 'float': 0.0, 'str': '', 'bool': False}
+
+pools = {}
+worker_programs = {}
+
+
+class Abort(BaseException):
+    # not caught by the function under test
+    pass
+
+
+@lru_cache(maxsize=8)
+def program(src_code):
+    # (name, source, ((parameter, type name), ...)) of every function. The
+    # sources are those the CFGs are built from, so their lines match.
+    functions = []
+    for node in ast.walk(ast.parse(src_code)):
+        if isinstance(node, ast.FunctionDef):
+            params = tuple((a.arg, a.annotation.id if isinstance(a.annotation, ast.Name) else None)
+                           for a in node.args.args)
+            functions.append((node.name, astor.to_source(node), params))
+    return tuple(functions)
+
+
+@lru_cache(maxsize=8)
+def load_seeds(filename):
+    # {function name: [{parameter: value}, ...]}
+    with open(filename) as f:
+        return json.load(f)
+
+
+def python_value(value):
+    # the value of a z3 model as the function under test takes it, None if
+    # there is no such value
+    if z3.is_int_value(value):
+        return value.as_long()
+    if z3.is_rational_value(value):
+        return float(value.as_fraction())
+    if z3.is_true(value) or z3.is_false(value):
+        return z3.is_true(value)
+    if z3.is_string_value(value):
+        return value.as_string()
+    return None
+
+
+def get_pool(jobs):
+    if jobs not in pools:
+        pools[jobs] = multiprocessing.Pool(jobs)
+    return pools[jobs]
+
+
+def close_pools():
+    for pool in pools.values():
+        pool.terminate()
+    pools.clear()
+
+
+def run(functions, func_name, inputs, timeout, max_lines, jobs=1):
+    # (trace, returned) of every input, a trace being the lines of the
+    # function executed, or None when the run could not be done. A run is cut
+    # after timeout seconds or max_lines lines, a worker stuck outside the
+    # traced code is killed with its pool.
+    pool = get_pool(jobs)
+    pending = [pool.apply_async(run_traced, ((functions, func_name, i, timeout, max_lines),)) for i in inputs]
+    results = []
+    for i, result in enumerate(pending):
+        try:
+            results.append(result.get(timeout + 1))
+        except multiprocessing.TimeoutError:
+            pools.pop(jobs).terminate()
+            return results + [None] * (len(inputs) - i)
+    return results
+
+
+def run_traced(task):
+    # runs in a worker, with the output of the function under test dropped
+    functions, func_name, arguments, timeout, max_lines = task
+    if functions not in worker_programs:
+        namespace = {'__name__': '__concolic__'}
+        for name, source, params in functions:
+            exec(compile(source, '<%s>' % name, 'exec'), namespace)
+        worker_programs.clear()
+        worker_programs[functions] = namespace
+    function = worker_programs[functions][func_name]
+    trace = []
+    until = time.monotonic() + timeout
+
+    def local(frame, event, arg):
+        if event == 'line':
+            trace.append(frame.f_lineno)
+            if len(trace) > max_lines or time.monotonic() > until:
+                raise Abort()
+        return local
+
+    def calls(frame, event, arg):
+        # only the lines of the outermost call, callees are analyzed on their
+        # own and the paths of a function do not enter them
+        if frame.f_code is function.__code__ and frame.f_back.f_code is run_traced.__code__:
+            return local
+        if time.monotonic() > until:
+            raise Abort()
+        return None
+
+    stdout = sys.stdout
+    returned = False
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        sys.settrace(calls)
+        try:
+            function(**arguments)
+            returned = True
+        except (Exception, Abort):
+            # cut short or failed, the trace so far is real
+            pass
+        finally:
+            sys.settrace(None)
+            sys.stdout = stdout
+    return trace, returned
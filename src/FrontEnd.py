@@ -0,0 +1,129 @@
+import os
+import ast
+import sys
+import pickle
+import hashlib
+from collections import OrderedDict
+from importlib import metadata
+
+import astor
+from fuzzingbook.ControlFlow import PyCFG, reset_registry
+
+import HelperFunc
+from HelperFunc import module_declarations
+
+# front ends of the most recent modules by content hash
+front_ends = OrderedDict()
+# bump when what a front end holds changes
+SCHEMA = 1
+
+
+def pickle_version():
+    # pickles of another python, fuzzingbook or schema are not read
+    try:
+        fuzzingbook = metadata.version('fuzzingbook')
+    except metadata.PackageNotFoundError:
+        fuzzingbook = 'unknown'
+    version = '%s/%s/%d' % (sys.version, fuzzingbook, SCHEMA)
+    return hashlib.sha256(version.encode()).hexdigest()[:12]
+
+
+def pickle_path(directory, key):
+    return os.path.join(directory, '%s_%s.pickle' % (key, pickle_version()))
+
+
+class FrontEnd:
+    # what the analysis of a module needs before any path is explored: its
+    # syntax tree and source, function names, variable/type table and CFGs,
+    # the latter by the functions they cover. Saved to a directory, if any,
+    # whenever a CFG is added.
+
+    def __init__(self, key, astree, directory=None):
+        self.key = key
+        self.astree = astree
+        self.src_code = astor.to_source(astree)
+        self.function_names = [node.name for node in ast.walk(astree) if isinstance(node, ast.FunctionDef)]
+        self.declarations = module_declarations(self.src_code)
+        self.cfgs = {}
+        self.directory = directory
+        # 'parsed', 'memory' or 'disk'
+        self.origin = 'parsed'
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['directory'], state['origin']
+        return state
+
+    def cfg(self, only=None):
+        only = None if only is None else frozenset(only)
+        if only not in self.cfgs:
+            self.cfgs[only] = module_CFG(self.astree, only)
+            self.save()
+        return self.cfgs[only]
+
+    def save(self):
+        if self.directory is None:
+            return
+        path = pickle_path(self.directory, self.key)
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(self, f)
+        except RecursionError:
+            # CFGs too deep to pickle are only kept in memory
+            os.remove(path + '.tmp')
+            return
+        os.replace(path + '.tmp', path)
+
+
+def load(filename, directory=None):
+    # the front end of a file, from memory, the directory or parsed anew
+    with open(filename, 'rb') as f:
+        key = hashlib.sha256(f.read()).hexdigest()
+    if key in front_ends:
+        front_end = remember(front_ends[key])
+        front_end.origin = 'memory'
+        return front_end
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        path = pickle_path(directory, key)
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    front_end = pickle.load(f)
+            except Exception:
+                # truncated or otherwise unreadable, the file is parsed again
+                # and the pickle replaced
+                front_end = None
+            if isinstance(front_end, FrontEnd):
+                front_end.directory, front_end.origin = directory, 'disk'
+                # fuzzers get the table through module_declarations
+                module_declarations(front_end.src_code, front_end.declarations)
+                return remember(front_end)
+    return remember(FrontEnd(key, astor.parse_file(filename), directory))
+
+
+def from_source(src_code):
+    # the front end of source text, kept in memory only
+    key = hashlib.sha256(src_code.encode()).hexdigest()
+    if key in front_ends:
+        return remember(front_ends[key])
+    return remember(FrontEnd(key, ast.parse(src_code)))
+
+
+def remember(front_end):
+    front_ends[front_end.key] = front_end
+    front_ends.move_to_end(front_end.key)
+    while len(front_ends) > HelperFunc.FRONT_ENDS:
+        front_ends.popitem(last=False)
+    return front_end
+
+
+def module_CFG(astree, only=None):
+    # fuzzingbook links the calls of every node built in the process, so the
+    # CFG of a module starts from an empty registry
+    reset_registry()
+    py_cfg = PyCFG()
+    for node in ast.walk(astree):
+        if isinstance(node, ast.FunctionDef) and (only is None or node.name in only):
+            py_cfg.gen_cfg(astor.to_source(node))
+    return py_cfg
@@ -0,0 +1,96 @@
+import heapq
+import random
+from collections import Counter, deque
+
+from HelperFunc import RESTART
+
+
+class BreadthFirst:
+    def __init__(self):
+        self.nodes = deque()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def push(self, nodes):
+        self.nodes.extend(nodes)
+
+    def pop(self):
+        return self.nodes.popleft()
+
+
+class DepthFirst:
+    def __init__(self):
+        self.nodes = []
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def push(self, nodes):
+        # the first child is explored first
+        self.nodes.extend(reversed(nodes))
+
+    def pop(self):
+        return self.nodes.pop()
+
+
+class RandomRestart(DepthFirst):
+    # depth first, but every restart pops it goes on from a random node of
+    # the frontier
+
+    def __init__(self, seed, restart=RESTART):
+        super().__init__()
+        self.random = random.Random(seed)
+        self.restart = restart
+        self.pops = 0
+
+    def pop(self):
+        self.pops += 1
+        if self.pops % self.restart == 0:
+            i = self.random.randrange(len(self.nodes))
+            self.nodes[i], self.nodes[-1] = self.nodes[-1], self.nodes[i]
+        return self.nodes.pop()
+
+
+class UncoveredFirst:
+    # nodes reached over the CFG edges taken least often come first, deeper
+    # ones before shallower ones. The counts grow while nodes wait, so a
+    # node is queued again when its edge was taken in the meantime.
+
+    def __init__(self):
+        self.nodes = []
+        self.covered = Counter()
+        self.pushed = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @staticmethod
+    def edge(node):
+        return None if node.parent is None else (node.parent.cfgnode.rid, node.cfgnode.rid)
+
+    def push(self, nodes):
+        for node in nodes:
+            self.pushed += 1
+            heapq.heappush(self.nodes, (self.covered[self.edge(node)], -node.idx, self.pushed, node))
+
+    def pop(self):
+        while True:
+            count, depth, pushed, node = heapq.heappop(self.nodes)
+            edge = self.edge(node)
+            if self.covered[edge] == count or not self.nodes:
+                self.covered[edge] += 1
+                return node
+            heapq.heappush(self.nodes, (self.covered[edge], depth, pushed, node))
+
+
+def make_frontier(search, seed=0):
+    if search == 'bfs':
+        return BreadthFirst()
+    elif search == 'dfs':
+        return DepthFirst()
+    elif search == 'random':
+        return RandomRestart(seed)
+    elif search == 'uncovered':
+        return UncoveredFirst()
+    raise ValueError('unknown search strategy %s' % search)
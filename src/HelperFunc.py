@@ -1,17 +1,67 @@
+import os
 import sys
+import hashlib
 import inspect
 import z3
 import ast
+import operator
 import astor
 from fuzzingbook.ControlFlow import PyCFG, CFGNode, to_graph, gen_cfg
 from graphviz import Source, Graph
 from fuzzingbook.Fuzzer import Fuzzer
 from contextlib import contextmanager
+from collections import OrderedDict
 
 
 MAX_ITER = 100
 MAX_TRIES = 100
 MAX_DEPTH = 100
+PRUNE_LEVELS = 4
+PRUNE_FRONTIER = 256
+CALLEE_CACHE_SIZE = 128
+CACHE_SIZE = 100000
+SOLVER_RESET = 1000
+MAX_BLOCKING = 1024
+DIVERSITY = 10
+RESTART = 64
+LOOP_BOUND = 10
+FRONT_ENDS = 8
+CONCOLIC_TIMEOUT = 1.0
+CONCOLIC_LINES = 10000
+SLICE_CACHE = 4096
+PREFIX_CACHE = 4096
+MODEL_CACHE = 256
+PRESOLVE_SAMPLES = 1024
+PRESOLVE_BATCH = 64
+CONCOLIC_BATCH = 64
+MODELS_PER_PATH = 1
+
+def unique_name(input):
+    # the name of a python file without .py, followed by a hash of its
+    # absolute path, so that files of the same name do not share outputs
+    return os.path.basename(input)[:-3] + '_' + hashlib.sha256(os.path.abspath(input).encode()).hexdigest()[:12]
+
+
+def loop_heads(enter):
+    # the targets of the back edges met by a depth first walk from enter
+    heads = {}
+    on_stack = {enter.rid}
+    done = set()
+    stack = [(enter, iter(enter.children))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            if child.rid in on_stack:
+                heads[child.rid] = child
+            elif child.rid not in done:
+                on_stack.add(child.rid)
+                stack.append((child, iter(child.children)))
+                break
+        else:
+            on_stack.discard(node.rid)
+            done.add(node.rid)
+            stack.pop()
+    return list(heads.values())
 
 def show_cfg(fn, **kwargs):
     return Source(to_graph(gen_cfg(inspect.getsource(fn)), **kwargs))
@@ -35,6 +85,131 @@ def to_src(astnode):
     return astor.to_source(astnode).strip()
 
 
+Z3_CONSTRUCTORS = {"z3.%s" % v1.__name__: v1 for (v1, v2) in SYM_VARS.values()}
+
+Z3_FUNCTIONS = {'z3.And': z3.And, 'z3.Or': z3.Or, 'z3.Not': z3.Not}
+
+BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Mod: operator.mod, ast.Pow: operator.pow}
+
+CMP_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge}
+
+
+def to_z3(astnode, symbol, sort=None):
+    # compiles the predicates built by to_single_assignment_predicates.
+    # symbol maps an identifier to its z3 constant, calls to analyzed
+    # functions become uninterpreted functions of the given result sort.
+    if isinstance(astnode, ast.Expr):
+        return to_z3(astnode.value, symbol, sort)
+    elif isinstance(astnode, ast.Call):
+        fn = astnode.func.id
+        if fn in Z3_FUNCTIONS:
+            return Z3_FUNCTIONS[fn](*[to_z3(i, symbol, z3.BoolSort()) for i in astnode.args])
+        args = [z3_value(to_z3(i, symbol)) for i in astnode.args]
+        result = z3.BoolSort() if sort is None else sort
+        return z3.Function(fn, *([a.sort() for a in args] + [result]))(*args)
+    elif isinstance(astnode, ast.Compare):
+        operands = to_z3_operands([astnode.left] + astnode.comparators, symbol)
+        conjuncts = [CMP_OPS[type(op)](left, right) for op, left, right in
+                     zip(astnode.ops, operands, operands[1:])]
+        return conjuncts[0] if len(conjuncts) == 1 else z3.And(*conjuncts)
+    elif isinstance(astnode, ast.BinOp):
+        left, right = to_z3_operands([astnode.left, astnode.right], symbol, sort)
+        return BIN_OPS[type(astnode.op)](left, right)
+    elif isinstance(astnode, ast.UnaryOp):
+        operand = to_z3(astnode.operand, symbol, sort)
+        if isinstance(astnode.op, ast.USub):
+            return -operand
+        elif isinstance(astnode.op, ast.UAdd):
+            return operand
+        return z3.Not(operand)
+    elif isinstance(astnode, ast.Name):
+        return symbol(astnode.id)
+    elif isinstance(astnode, ast.Constant):
+        return astnode.value
+    else:
+        raise Exception(str(astnode))
+
+
+def to_z3_operands(nodes, symbol, sort=None):
+    # calls take the sort of the operands they are compared or combined with
+    values = {i: to_z3(n, symbol) for i, n in enumerate(nodes) if not isinstance(n, ast.Call)}
+    sorts = [z3_value(v).sort() for v in values.values()]
+    sort = sorts[0] if sorts else (z3.IntSort() if sort is None else sort)
+    return [values[i] if i in values else to_z3(n, symbol, sort) for i, n in enumerate(nodes)]
+
+
+def z3_value(value):
+    if z3.is_expr(value):
+        return value
+    elif isinstance(value, bool):
+        return z3.BoolVal(value)
+    elif isinstance(value, str):
+        return z3.StringVal(value)
+    return SYM_VARS[type(value)][1](value)
+
+
+def dump_test_case(test_case):
+    # picklable form of a test case built by main.analyze. The constraints and
+    # the model are written as one SMT-LIB script, the core as indices.
+    constraints = test_case['constraint']
+    data = {'keys': list(test_case), 'size': len(constraints), 'constant': test_case.get('constant')}
+    exprs = list(constraints)
+    if 'statement' in test_case:
+        data['statement'] = test_case['statement']
+    if 'unsat_core' in test_case:
+        core = {c.get_id() for c in test_case['unsat_core']}
+        data['unsat_core'] = [i for i, c in enumerate(constraints) if c.get_id() in core]
+    elif 'unknown' in test_case:
+        data['unknown'] = test_case['unknown']
+    else:
+        data['model'] = [k for k in data['keys'] if k not in ('constraint', 'constant', 'models', 'statement')
+                         and test_case[k] is not None]
+        exprs += [test_case[k] == z3.Const(k, test_case[k].sort()) for k in data['model']]
+        # the further inputs of the path, one script each
+        data['models'] = [(list(m), dump_model(m)) for m in test_case.get('models', [])]
+    data['smt2'] = dump_model({}, exprs)
+    return data
+
+
+def dump_model(arguments, exprs=()):
+    solver = z3.Solver()
+    solver.add(*exprs)
+    solver.add(*[v == z3.Const(k, v.sort()) for k, v in arguments.items() if v is not None])
+    return solver.sexpr()
+
+
+def load_model(keys, smt2):
+    values = {e.arg(1).decl().name(): e.arg(0) for e in z3.parse_smt2_string(smt2)}
+    return {k: values.get(k, None) for k in keys}
+
+
+def load_test_case(data):
+    exprs = list(z3.parse_smt2_string(data['smt2']))
+    constraints = exprs[:data['size']]
+    values = {e.arg(1).decl().name(): e.arg(0) for e in exprs[data['size']:]}
+    test_case = {}
+    for k in data['keys']:
+        if k == 'constraint':
+            test_case[k] = constraints
+        elif k == 'constant':
+            test_case[k] = data['constant']
+        elif k == 'unsat_core':
+            test_case[k] = [constraints[i] for i in data['unsat_core']]
+        elif k in ('statement', 'unknown'):
+            test_case[k] = data[k]
+        elif k == 'path':
+            test_case[k] = [constraints]
+        elif k == 'models':
+            test_case[k] = [load_model(keys, smt2) for keys, smt2 in data['models']]
+        else:
+            test_case[k] = values.get(k, None)
+    return test_case
+
+
 def get_expression(src):
     return ast.parse(src).body[0].value
 
@@ -182,6 +357,22 @@ def declarations(astnode, hm=None):
 
 
 
+# variable/type tables of the most recent modules by source
+declaration_tables = OrderedDict()
+
+
+def module_declarations(src_code, table=None):
+    # computed once per module, the fuzzers of its functions only read it.
+    # A table computed before, as that of a saved front end, is taken as it is.
+    if src_code in declaration_tables:
+        declaration_tables.move_to_end(src_code)
+    else:
+        declaration_tables[src_code] = declarations(ast.parse(src_code)) if table is None else table
+        while len(declaration_tables) > FRONT_ENDS:
+            declaration_tables.popitem(last=False)
+    return declaration_tables[src_code]
+
+
 def define_symbolic_vars(fn_vars, prefix):
     sym_var_dec = ', '.join([prefix + n for n in fn_vars])
     sym_var_def = ', '.join(["%s('%s%s')" % (t, prefix, n)
@@ -201,6 +392,8 @@ def gen_fn_summary(prefix, fn):
 @contextmanager
 def checkpoint(z3solver):
     z3solver.push()
-    yield z3solver
-    z3solver.pop()
+    try:
+        yield z3solver
+    finally:
+        z3solver.pop()
 
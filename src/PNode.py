@@ -1,32 +1,43 @@
 from HelperFunc import to_src
-from SymbolicFuzzer import to_single_assignment_predicates
-from HelperFunc import MAX_ITER
+from SymbolicFuzzer import to_single_assignment_predicate, assigns
 
 
 class PNode:
+    # paths share their prefixes, a node is created once per taken branch
+    __slots__ = ('idx', 'cfgnode', 'parent', 'order', 'visits', 'ssa', 'constraints')
 
-    def __init__(self, idx, cfgnode, parent=None, order=0, seen=None):
-        self.seen = {} if seen is None else seen
-        self.max_iter = MAX_ITER
+    def __init__(self, idx, cfgnode, parent=None, order=0, visits=None):
+        # how often the path entered each loop head, by rid. Shared with the
+        # parent unless this node is a loop head.
+        self.visits = {} if visits is None else visits
         self.idx, self.cfgnode, self.parent, self.order = idx, cfgnode, parent, order
+        self.ssa = None
+        # compiled by the fuzzer from the predicates of ssa
+        self.constraints = None
 
     def __repr__(self):
         return "PNode:%d[%s order:%d]" % (self.idx, str(self.cfgnode), self.order)
 
     def copy(self, order):
-        p = PNode(self.idx, self.cfgnode, self.parent, order, self.seen)
+        p = PNode(self.idx, self.cfgnode, self.parent, order, self.visits)
         assert p.order == order
         return p
 
-    def explore(self):
+    def explore(self, loops):
+        # loops maps the rid of every loop head to its unroll bound, a head
+        # is entered at most bound + 1 times
         ret = []
         for (i, n) in enumerate(self.cfgnode.children):
-            key = "[%d]%s" % (self.idx + 1, n)
-            ccount = self.seen.get(key, 0)
-            if ccount > self.max_iter:
-                continue  # drop this child
-            self.seen[key] = ccount + 1
-            pn = PNode(self.idx + 1, n, self.copy(i), seen=self.seen)
+            visits = self.visits
+            if n.rid in loops:
+                count = visits.get(n.rid, 0)
+                if count > loops[n.rid]:
+                    continue  # drop this child
+                visits = dict(visits)
+                visits[n.rid] = count + 1
+            # a fresh node has order 0, it is its own parent on that branch
+            parent = self if i == self.order else self.copy(i)
+            pn = PNode(self.idx + 1, n, parent, visits=visits)
             ret.append(pn)
         return ret
 
@@ -36,10 +47,33 @@ class PNode:
         while n:
             path.append(n)
             n = n.parent
-        # print(list(reversed(path)))
-        return list(reversed(path))
+        path.reverse()
+        return path
+
+    def single_assignment(self):
+        # (SSA predicates of this node, renaming after it, whether the path
+        # is completed, whether it is valid), derived from the parent's. The
+        # renaming is shared with the parent unless the node assigns.
+        if self.ssa is None:
+            pending = []
+            n = self
+            while n is not None and n.ssa is None:
+                pending.append(n)
+                n = n.parent
+            for n in reversed(pending):
+                env, completed, valid = ({}, False, True) if n.parent is None else n.parent.ssa[1:]
+                step = None
+                if valid:
+                    new_env = dict(env) if assigns(n) else env
+                    step = to_single_assignment_predicate(n, new_env)
+                if step is None:
+                    n.ssa = ([], env, False, False)
+                else:
+                    n.ssa = (step[0], new_env, completed or step[1], True)
+        return self.ssa
 
     def __str__(self):
         path = self.get_path_to_root()
-        ssa_path = to_single_assignment_predicates(path)
-        return ', '.join([to_src(p) for p in ssa_path])
+        if not self.single_assignment()[3]:
+            return ''
+        return ', '.join([to_src(p) for n in path for p in n.single_assignment()[0] if p is not None])
@@ -0,0 +1,137 @@
+import re
+
+import z3
+
+# operands of these can be put in any order
+COMMUTATIVE = {z3.Z3_OP_AND, z3.Z3_OP_OR, z3.Z3_OP_XOR, z3.Z3_OP_ADD, z3.Z3_OP_MUL, z3.Z3_OP_EQ, z3.Z3_OP_DISTINCT}
+# a > b is kept as b < a
+MIRRORED = {z3.Z3_OP_GT: z3.Z3_OP_LT, z3.Z3_OP_GE: z3.Z3_OP_LE}
+# names given by rename_variables
+SSA_NAME = re.compile(r'^_.+_\d+$')
+
+
+class PathIndex:
+    # the constraint lists of the paths seen so far. A path is a duplicate if
+    # its constraints are the same z3 expressions as those of an earlier one,
+    # and collapses into an earlier one if they only differ in the numbering
+    # of SSA variables, the order of commutative operands and predicates, or
+    # predicates that are trivially true or repeated.
+
+    def __init__(self):
+        # hashes of the constraint ids of the paths, which only tell
+        # duplicates from collapsed paths, and the keys of the paths
+        self.exact = set()
+        self.keys = set()
+        self.shapes = {}
+        self.templates = {}
+        # the path added last, as (constraint id, SSA names it numbered first,
+        # canonical forms of its predicates) per constraint, and the numbers
+        # of the SSA names
+        self.stack = []
+        self.names = {}
+        self.duplicates = 0
+        self.collapsed = 0
+
+    def add(self, constraints):
+        # False if an equivalent path was added before. The ids stay unique
+        # as the templates keep the constraints alive.
+        ids = hash(tuple(c.get_id() for c in constraints))
+        duplicate = ids in self.exact
+        self.exact.add(ids)
+        key = self.key(constraints)
+        if key in self.keys:
+            if duplicate:
+                self.duplicates += 1
+            else:
+                self.collapsed += 1
+            return False
+        self.keys.add(key)
+        return True
+
+    def key(self, constraints):
+        # the canonical forms of the predicates, with the SSA variables
+        # numbered in the order they first occur along the path. The forms of
+        # the prefix shared with the path added last are kept.
+        shared = 0
+        while shared < min(len(self.stack), len(constraints)) and \
+                self.stack[shared][0] == constraints[shared].get_id():
+            shared += 1
+        while len(self.stack) > shared:
+            for name in self.stack.pop()[1]:
+                del self.names[name]
+        for c in constraints[shared:]:
+            numbered, forms = [], []
+            for template, ssa in self.template_forms(c):
+                for name in ssa:
+                    if name not in self.names:
+                        self.names[name] = len(self.names)
+                        numbered.append(name)
+                forms.append((template, tuple(self.names[name] for name in ssa)))
+            self.stack.append((c.get_id(), numbered, forms))
+        return frozenset(form for _, _, forms in self.stack for form in forms)
+
+    def template_forms(self, c):
+        # (template, SSA names) of every predicate of c that is not trivial,
+        # the names being those the template numbers, see template
+        if c.get_id() not in self.templates:
+            forms = []
+            for p in conjuncts(c):
+                if not trivial(p):
+                    ssa = []
+                    forms.append((self.template(p, ssa), tuple(ssa)))
+            # the constraint keeps its id alive
+            self.templates[c.get_id()] = (c, forms)
+        return self.templates[c.get_id()][1]
+
+    def shape(self, e):
+        # the canonical form without the SSA numbering, which orders operands
+        # before their variables are numbered
+        if e.get_id() not in self.shapes:
+            if is_variable(e):
+                shape = ('var', str(e.sort()) if SSA_NAME.match(e.decl().name()) else e.decl().name())
+            else:
+                shape = self.structure(e, self.shape)
+            # the expression keeps its id alive
+            self.shapes[e.get_id()] = (e, shape)
+        return self.shapes[e.get_id()][1]
+
+    def template(self, e, ssa):
+        # the canonical form with the SSA variables numbered in the order of
+        # the operands within e, the names in that order go to ssa
+        if is_variable(e):
+            name = e.decl().name()
+            if not SSA_NAME.match(name):
+                return 'var', name
+            if name not in ssa:
+                ssa.append(name)
+            return 'ssa', ssa.index(name), str(e.sort())
+        return self.structure(e, lambda child: self.template(child, ssa))
+
+    def structure(self, e, form):
+        if z3.is_int_value(e) or z3.is_rational_value(e) or z3.is_true(e) or z3.is_false(e):
+            return 'value', e.sexpr()
+        if not z3.is_app(e):
+            return 'expr', e.sexpr()
+        kind = e.decl().kind()
+        children = e.children()
+        if kind in MIRRORED:
+            kind = MIRRORED[kind]
+            children = children[::-1]
+        elif kind in COMMUTATIVE:
+            children = sorted(children, key=self.shape)
+        name = e.decl().name() if kind == z3.Z3_OP_UNINTERPRETED else 'op%d' % kind
+        return (name,) + tuple(form(child) for child in children)
+
+
+def is_variable(e):
+    return z3.is_const(e) and e.decl().kind() == z3.Z3_OP_UNINTERPRETED
+
+
+def conjuncts(e):
+    if z3.is_and(e):
+        return [c for child in e.children() for c in conjuncts(child)]
+    return [e]
+
+
+def trivial(e):
+    return z3.is_true(e) or (z3.is_eq(e) and e.arg(0).eq(e.arg(1)))
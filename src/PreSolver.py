@@ -0,0 +1,221 @@
+import z3
+
+from PathIndex import conjuncts, is_variable
+
+try:
+    import numpy
+except ImportError:
+    # --presolve is refused without it
+    numpy = None
+
+# coefficients, constants and sampled values stay below these, so that no
+# sum of products overflows 64 bits
+LIMIT = 2 ** 24
+SPREAD = 2 ** 26
+# satisfying candidates tried on a path before the solver is left with it
+TRIES = 4
+# comparisons with 0 an atom can make, a > b is kept as b - a < 0
+LT, LE, EQ, NE = '<', '<=', '==', '!='
+NEGATED = {LT: None, LE: None, EQ: NE, NE: EQ}
+
+
+def linear_atoms(e):
+    # e as a list of atoms (coefficients by name, constant, op), meaning
+    # sum(coefficient * variable) + constant op 0, None if it is not a
+    # conjunction of linear comparisons over ints
+    atoms = []
+    for p in conjuncts(e):
+        if z3.is_true(p):
+            continue
+        negated = z3.is_not(p)
+        if negated:
+            p = p.arg(0)
+        atom = comparison(p)
+        if atom is None:
+            return None
+        if negated:
+            atom = negation(atom)
+        atoms.append(atom)
+    return atoms
+
+
+def comparison(p):
+    if p.num_args() != 2 or not all(arg.sort() == z3.IntSort() for arg in p.children()):
+        return None
+    left, right = term(p.arg(0)), term(p.arg(1))
+    if left is None or right is None:
+        return None
+    if z3.is_lt(p) or z3.is_le(p) or z3.is_eq(p) or z3.is_distinct(p):
+        difference = combine(left, right, -1)
+    elif z3.is_gt(p) or z3.is_ge(p):
+        difference = combine(right, left, -1)
+    else:
+        return None
+    op = LT if z3.is_lt(p) or z3.is_gt(p) else LE if z3.is_le(p) or z3.is_ge(p) else EQ if z3.is_eq(p) else NE
+    return difference + (op,)
+
+
+def negation(atom):
+    coefficients, constant, op = atom
+    if NEGATED[op] is not None:
+        return coefficients, constant, NEGATED[op]
+    # not (e < 0) is -e <= 0, not (e <= 0) is -e < 0
+    coefficients = {name: -c for name, c in coefficients.items()}
+    return coefficients, -constant, LE if op == LT else LT
+
+
+def term(e):
+    # (coefficients by name, constant) of a linear int term, None otherwise
+    if z3.is_int_value(e):
+        value = e.as_long()
+        return ({}, value) if abs(value) < LIMIT else None
+    if is_variable(e):
+        return {e.decl().name(): 1}, 0
+    if z3.is_add(e) or z3.is_sub(e):
+        result = term(e.arg(0))
+        for i in range(1, e.num_args()):
+            other = term(e.arg(i))
+            if result is None or other is None:
+                return None
+            result = combine(result, other, 1 if z3.is_add(e) else -1)
+        return result
+    if z3.is_app_of(e, z3.Z3_OP_UMINUS):
+        inner = term(e.arg(0))
+        return None if inner is None else scale(inner, -1)
+    if z3.is_mul(e) and e.num_args() == 2:
+        left, right = term(e.arg(0)), term(e.arg(1))
+        if left is None or right is None:
+            return None
+        # one side has to be a constant
+        if not left[0]:
+            return scale(right, left[1])
+        if not right[0]:
+            return scale(left, right[1])
+    return None
+
+
+def combine(left, right, sign):
+    coefficients = dict(left[0])
+    for name, c in right[0].items():
+        coefficients[name] = coefficients.get(name, 0) + sign * c
+    return bounded({name: c for name, c in coefficients.items() if c}, left[1] + sign * right[1])
+
+
+def scale(t, factor):
+    return bounded({name: c * factor for name, c in t[0].items() if c * factor}, t[1] * factor)
+
+
+def bounded(coefficients, constant):
+    if abs(constant) >= LIMIT or any(abs(c) >= LIMIT for c in coefficients.values()):
+        return None
+    return coefficients, constant
+
+
+def eliminate(atoms, keep):
+    # (definitions, atoms left). Every equality with a coefficient of 1 or -1
+    # on a variable outside keep defines that variable, which is replaced by
+    # its definition everywhere. The definitions are in the variables left.
+    definitions = {}
+    left = []
+    for atom in atoms:
+        coefficients, constant, op = substitute(atom, definitions)
+        if op == EQ:
+            name = next((n for n, c in coefficients.items() if n not in keep and abs(c) == 1), None)
+            if name is not None:
+                # name = -(rest + constant) / c, with c being 1 or -1
+                rest = {n: c for n, c in coefficients.items() if n != name}
+                definition = scale((rest, constant), -coefficients[name])
+                if definition is None:
+                    return None
+                for n, d in definitions.items():
+                    if name in d[0]:
+                        definitions[n] = substitute(d + (EQ,), {name: definition})[:2]
+                definitions[name] = definition
+                continue
+        left.append((coefficients, constant, op))
+    return definitions, [substitute(atom, definitions) for atom in left]
+
+
+def substitute(atom, definitions):
+    coefficients, constant, op = atom
+    if not any(name in definitions for name in coefficients):
+        return atom
+    result = ({}, constant)
+    for name, c in coefficients.items():
+        t = scale(definitions[name], c) if name in definitions else ({name: c}, 0)
+        result = combine(result, t, 1) if t is not None else None
+        if result is None:
+            # too large to sample, kept as it is and rejected by the check
+            return atom
+    return result + (op,)
+
+
+def search(systems, samples, seed):
+    # (names, candidates, satisfied): a block of samples candidate inputs for
+    # the variables of the systems, one per row, and whether each row
+    # satisfies each system, one per column. Values are drawn around the
+    # constants the atoms compare with, or at random.
+    names = sorted({name for atoms in systems for coefficients, _, _ in atoms for name in coefficients})
+    column = {name: i for i, name in enumerate(names)}
+    boundaries = [{0} for _ in names]
+    spread = 16
+    for atoms in systems:
+        for coefficients, constant, _ in atoms:
+            spread = max(spread, 2 * abs(constant) + 16)
+            if len(coefficients) == 1:
+                (name, c), = coefficients.items()
+                at = -constant // c
+                boundaries[column[name]].update((at - 1, at, at + 1))
+    spread = min(spread, SPREAD)
+    rng = numpy.random.default_rng(seed)
+    candidates = rng.integers(-spread, spread + 1, size=(samples, len(names)), dtype=numpy.int64)
+    for i, values in enumerate(boundaries):
+        values = numpy.array(sorted(v for v in values if abs(v) <= SPREAD), dtype=numpy.int64)
+        # about half the values of a variable are boundary values
+        at = rng.random(samples) < 0.5
+        candidates[at, i] = rng.choice(values, size=int(at.sum()))
+    # atoms shared by systems are evaluated once, every system starts with
+    # one that always holds, so none is empty
+    unique = {((), 0, LE): 0}
+    indices, starts = [], []
+    for atoms in systems:
+        starts.append(len(indices))
+        indices.append(0)
+        for coefficients, constant, op in atoms:
+            key = (tuple(sorted(coefficients.items())), constant, op)
+            indices.append(unique.setdefault(key, len(unique)))
+    matrix = numpy.zeros((len(unique), len(names)), dtype=numpy.int64)
+    constants = numpy.zeros(len(unique), dtype=numpy.int64)
+    ops = numpy.empty(len(unique), dtype=object)
+    for (coefficients, constant, op), i in unique.items():
+        for name, c in coefficients:
+            matrix[i, column[name]] = c
+        constants[i], ops[i] = constant, op
+    values = candidates @ matrix.T + constants
+    met = numpy.where(ops == LT, values < 0, numpy.where(ops == LE, values <= 0,
+                      numpy.where(ops == EQ, values == 0, values != 0)))
+    satisfied = numpy.logical_and.reduceat(met[:, indices], starts, axis=1)
+    return names, candidates, satisfied
+
+
+def holds(atoms, values):
+    # whether the values satisfy every atom, in exact arithmetic
+    for coefficients, constant, op in atoms:
+        value = constant + sum(c * values.get(name, 0) for name, c in coefficients.items())
+        if not (value < 0 if op == LT else value <= 0 if op == LE else value == 0 if op == EQ else value != 0):
+            return False
+    return True
+
+
+def assignment(names, candidate, definitions, atoms):
+    # values by name of the variables of the atoms in a row, and of those the
+    # definitions give
+    used = {name for coefficients, _, _ in atoms for name in coefficients}
+    values = {name: int(v) for name, v in zip(names, candidate) if name in used}
+    for coefficients, _ in definitions.values():
+        # constrained by nothing but the definitions
+        for name in coefficients:
+            values.setdefault(name, 0)
+    for name, (coefficients, constant) in definitions.items():
+        values[name] = constant + sum(c * values[n] for n, c in coefficients.items())
+    return values
@@ -0,0 +1,182 @@
+import json
+import time
+from collections import Counter
+
+# seconds between flushes within the analysis of a function
+FLUSH_INTERVAL = 1.0
+STARS = '*************************************************************************************************\n'
+
+
+class ReportSink:
+    # writes one JSON record per path as soon as it is solved. Records of one
+    # analysis of a function share their 'analysis' number. The file is
+    # flushed whenever an analysis begins and at least every FLUSH_INTERVAL
+    # seconds, so a crash leaves nearly every record written so far.
+
+    def __init__(self, filename):
+        self.file = open(filename, 'w')
+        self.analyses = 0
+        # records by status
+        self.counts = Counter()
+        self.flushed = time.monotonic()
+        # the printed constraints of the current analysis by id, paths share
+        # most of theirs
+        self.printed = {}
+
+    def begin(self, func_name):
+        self.analyses += 1
+        self.printed.clear()
+        self.flush()
+
+    def write(self, func_name, test_case):
+        record = path_record(func_name, test_case, self.analyses, self.text)
+        self.counts[record['status']] += 1
+        self.file.write(json.dumps(record) + '\n')
+        if time.monotonic() - self.flushed >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        self.flushed = time.monotonic()
+
+    def text(self, c):
+        if c.get_id() not in self.printed:
+            # the constraint keeps its id alive
+            self.printed[c.get_id()] = (c, str(c))
+        return self.printed[c.get_id()][1]
+
+    def write_results(self, results):
+        # results in the form returned by main.analyze
+        for result in results:
+            for fn_name, test_cases in result.items():
+                self.begin(fn_name)
+                for test_case in test_cases:
+                    self.write(fn_name, test_case)
+
+    def close(self):
+        self.file.close()
+
+
+def path_record(func_name, test_case, analysis, text=str):
+    # text prints a constraint
+    record = {'analysis': analysis, 'function': func_name,
+              'constraints': [text(c) for c in test_case['constraint']]}
+    if 'constant' in test_case:
+        record['constant'] = [c if c is None or isinstance(c, (int, float)) else str(c)
+                              for c in test_case['constant']]
+    if 'unsat_core' in test_case:
+        record['status'] = 'unsat'
+        record['unsat_core'] = [text(c) for c in test_case['unsat_core']]
+        record['lines'] = test_case['statement']
+    elif 'unknown' in test_case:
+        record['status'] = 'unknown'
+        record['reason'] = test_case['unknown']
+        record['lines'] = test_case['statement']
+    else:
+        record['status'] = 'sat'
+        record['model'] = model_items(test_case)
+        if 'models' in test_case:
+            record['models'] = [model_items(m) for m in test_case['models']]
+        record['lines'] = test_case['statement']
+    return record
+
+
+def model_items(arguments):
+    return [[k, None if v is None else str(v)] for k, v in arguments.items()
+            if k not in ('constraint', 'constant', 'models', 'statement')]
+
+
+def read_records(filename):
+    with open(filename) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def analyses(filename):
+    # (function, records) of every analysis with records, one at a time
+    function, analysis, records = None, None, []
+    for record in read_records(filename):
+        if record['analysis'] != analysis and records:
+            yield function, records
+            records = []
+        function, analysis = record['function'], record['analysis']
+        records.append(record)
+    if records:
+        yield function, records
+
+
+def render_text(filename, output):
+    # the text report of a record stream, reading the stream once per section
+    with open(output, 'w+') as f:
+        f.write('***************************************** ALL PATH CONSTRAINTS **********************************\n')
+        for fn_name, records in analyses(filename):
+            f.write('***************************************** FUNC NAME: ' + fn_name +
+                    ' *************************************\n')
+            for i, record in enumerate(records):
+                f.write('\t' + str(i + 1) + ': ' + str(record['constraints']) + '\n')
+            f.write(STARS + '\n')
+
+        f.write(STARS)
+        f.write('********************* UNSATISFIED PATH *********************\n')
+        f.write(STARS + '\n')
+        for fn_name, records in analyses(filename):
+            f.write('\n****************** FUNCTION NAME: ' + fn_name + ' ******************\n')
+            for record in records:
+                if record['status'] == 'unsat':
+                    f.write("\n******************##### UNSAT PATH FOUND #####******************\n")
+                    if 'constant' in record:
+                        f.write('------ constraint values: \n')
+                        f.write('Variables: ' + ', '.join(str(c) for c in record['constant']) + '\n')
+                    f.write('------ constraint path: \n')
+                    for s in record['constraints']:
+                        f.write('\t' + s + '\n')
+                    f.write('------ unsat core: \n')
+                    f.write('Unsat core: \n')
+                    for s in record['unsat_core']:
+                        f.write('\t' + s + '\n')
+                    f.write('------ statement: \n')
+                    f.write('Unsat path statements: \n')
+                    for at, s in record['lines'][:len(record['unsat_core'])]:
+                        f.write('\t#line ' + str(at) + ': ' + str(s) + '\n')
+                    f.write(STARS + '\n')
+            f.write('\n' + '#' * (len(fn_name) + 48) + '\n')
+
+        f.write(STARS)
+        f.write('****************** SATISFIED PATH ******************\n')
+        f.write(STARS + '\n')
+        for fn_name, records in analyses(filename):
+            f.write('\n****************** FUNCTION NAME: ' + fn_name + ' ******************\n')
+            for record in records:
+                if record['status'] == 'sat':
+                    for k, v in record['model']:
+                        f.write(str(k) + ": " + str(v) + '\n')
+                    for model in record.get('models', []):
+                        f.write('------ another input: \n')
+                        for k, v in model:
+                            f.write(str(k) + ": " + str(v) + '\n')
+                    f.write('****************** CONSTRAINT PATH ******************\n')
+                    for s in record['constraints']:
+                        f.write(s + '\n')
+                    f.write('******************************************************\n\n')
+                    if 'constant' in record:
+                        f.write('constant: ' + str([str(c) for c in record['constant']]) + '\n')
+            f.write('\n' + '#' * (len(fn_name) + 48) + '\n')
+
+        if not any(record['status'] == 'unknown' for record in read_records(filename)):
+            return
+        f.write(STARS)
+        f.write('****************** UNKNOWN PATH ******************\n')
+        f.write(STARS + '\n')
+        for fn_name, records in analyses(filename):
+            unknown = [record for record in records if record['status'] == 'unknown']
+            if unknown:
+                f.write('\n****************** FUNCTION NAME: ' + fn_name + ' ******************\n')
+                for record in unknown:
+                    f.write('------ reason: ' + str(record['reason']) + '\n')
+                    if 'constant' in record:
+                        f.write('Variables: ' + ', '.join(str(c) for c in record['constant']) + '\n')
+                    f.write('------ constraint path: \n')
+                    for s in record['constraints']:
+                        f.write('\t' + s + '\n')
+                    f.write('******************************************************\n\n')
+                f.write('\n' + '#' * (len(fn_name) + 48) + '\n')
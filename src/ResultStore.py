@@ -0,0 +1,41 @@
+import os
+import json
+
+from HelperFunc import dump_test_case, load_test_case, unique_name
+
+# bump when the stored form of a test case changes
+FORMAT = 2
+
+
+class ResultStore:
+    # results of the analysis of the functions of one input file, by
+    # function fingerprint. Only the fingerprints used in a run are saved.
+
+    def __init__(self, directory, input):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, unique_name(input) + '.json')
+        self.previous = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                stored = json.load(f)
+            # results stored in another form are analyzed again
+            if stored.get('format') == FORMAT:
+                self.previous = stored['results']
+        self.current = {}
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self.previous
+
+    def get(self, fingerprint):
+        self.current[fingerprint] = self.previous[fingerprint]
+        return [{fn_name: [load_test_case(t) for t in test_cases] for fn_name, test_cases in result.items()}
+                for result in self.previous[fingerprint]]
+
+    def put(self, fingerprint, results):
+        self.current[fingerprint] = [{fn_name: [dump_test_case(t) for t in test_cases]
+                                      for fn_name, test_cases in result.items()} for result in results]
+
+    def save(self):
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump({'format': FORMAT, 'results': self.current}, f)
+        os.replace(self.path + '.tmp', self.path)
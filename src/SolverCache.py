@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from collections import Counter
+
+import z3
+
+# bump when the stored format changes
+SCHEMA = 2
+
+caches = {}
+
+
+def open_cache(directory, max_entries):
+    # one connection per process and directory
+    key = (os.path.abspath(directory), os.getpid())
+    if key not in caches:
+        caches[key] = SolverCache(directory, max_entries)
+    return caches[key]
+
+
+class SolverCache:
+    # solutions of path constraint lists, stored in the (is_sat, solution)
+    # form of SolverPool.solve_smt2 under a hash of their SMT-LIB text
+
+    def __init__(self, directory, max_entries):
+        os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self.db = sqlite3.connect(os.path.join(directory, 'solver_cache.sqlite'), timeout=60, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS solutions '
+                        '(key TEXT PRIMARY KEY, sat INTEGER, solution TEXT, last_used REAL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)')
+        version = '%s/%d' % (z3.get_version_string(), SCHEMA)
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if row is None or row[0] != version:
+            # answers of another z3 version are not trusted
+            self.clear()
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+        self.size = self.db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    @staticmethod
+    def key(smt2, names):
+        return hashlib.sha256(('%s\n%s' % (smt2, ' '.join(sorted(names)))).encode()).hexdigest()
+
+    def get(self, key):
+        row = self.db.execute('SELECT sat, solution FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        self.db.execute('UPDATE solutions SET last_used = ? WHERE key = ?', (time.time(), key))
+        is_sat, solution = bool(row[0]), row[1]
+        return is_sat, solution if is_sat else json.loads(solution)
+
+    def has(self, key):
+        return self.db.execute('SELECT 1 FROM solutions WHERE key = ?', (key,)).fetchone() is not None
+
+    def put(self, key, is_sat, solution):
+        cursor = self.db.execute('INSERT OR IGNORE INTO solutions VALUES (?, ?, ?, ?)',
+                                 (key, int(is_sat), solution if is_sat else json.dumps(solution), time.time()))
+        self.stats['stores'] += cursor.rowcount
+        self.size += cursor.rowcount
+        if self.size > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        # least recently used first, down to nine tenths of the limit
+        keep = self.max_entries * 9 // 10
+        cursor = self.db.execute('DELETE FROM solutions WHERE key IN '
+                                 '(SELECT key FROM solutions ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (keep,))
+        self.stats['evictions'] += cursor.rowcount
+        self.size -= cursor.rowcount
+
+    def clear(self):
+        self.db.execute('DELETE FROM solutions')
+        self.size = 0
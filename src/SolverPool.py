@@ -0,0 +1,61 @@
+import z3
+from concurrent.futures import ProcessPoolExecutor
+
+# paths in flight per worker
+WINDOW = 4
+
+# solvers kept for reuse, at most this many
+SOLVERS = 8
+# z3's timeout parameter when there is none
+NO_TIMEOUT = 4294967295
+
+pools = {}
+solvers = []
+
+
+def get_pool(jobs):
+    if jobs not in pools:
+        pools[jobs] = ProcessPoolExecutor(max_workers=jobs)
+    return pools[jobs]
+
+
+def acquire_solver():
+    return solvers.pop() if solvers else z3.Solver()
+
+
+def release_solver(solver):
+    # a released solver is reset, it keeps neither assertions nor what it
+    # learned, nor a timeout
+    solver.reset()
+    solver.set('timeout', NO_TIMEOUT)
+    if len(solvers) < SOLVERS:
+        solvers.append(solver)
+
+
+def solve_smt2(task):
+    # runs in a worker: the constraints arrive as SMT-LIB text and are solved
+    # in a context of their own, within timeout milliseconds if not None, so
+    # the answer depends on the text alone and not on the worker.
+    # Returns (True, model) with the model as SMT-LIB equalities over the
+    # requested names, every constant if names is None, (False, indices of
+    # the unsat core) or (None, the reason z3 gave up).
+    smt2, names, timeout = task
+    ctx = z3.Context()
+    solver = z3.Solver(ctx=ctx)
+    if timeout is not None:
+        solver.set('timeout', timeout)
+    trackers = []
+    for i, cons in enumerate(z3.parse_smt2_string(smt2, ctx=ctx)):
+        trackers.append(z3.Bool('p%d' % i, ctx))
+        solver.assert_and_track(cons, trackers[i])
+    result = solver.check()
+    if result == z3.unknown:
+        return None, solver.reason_unknown()
+    if result != z3.sat:
+        core = {tracker.get_id() for tracker in solver.unsat_core()}
+        return False, [i for i, tracker in enumerate(trackers) if tracker.get_id() in core]
+    model = solver.model()
+    tracking = {tracker.decl().get_id() for tracker in trackers}
+    return True, ''.join('(assert (= %s %s))' % (d.name(), model[d].sexpr())
+                         for d in model.decls() if d.arity() == 0 and d.get_id() not in tracking
+                         and (names is None or d.name() in names))
@@ -7,35 +7,49 @@ from fuzzingbook.ControlFlow import PyCFG, CFGNode, to_graph, gen_cfg
 from graphviz import Source, Graph
 from fuzzingbook.Fuzzer import Fuzzer
 from contextlib import contextmanager
+from collections import Counter
 
-from HelperFunc import declarations, to_src, define_symbolic_vars, checkpoint, MAX_DEPTH, MAX_TRIES, MAX_ITER
+import SolverPool
+from HelperFunc import module_declarations, to_src, define_symbolic_vars, checkpoint, Z3_CONSTRUCTORS, MAX_DEPTH, MAX_TRIES, MAX_ITER
 
 
 class SimpleSymbolicFuzzer(Fuzzer):
     def __init__(self, func_name , src_code, py_cfg, **kwargs):
         self.fn_name = func_name
+        self.src_code = src_code
 
         self.py_cfg = py_cfg
         self.fnenter, self.fnexit = self.py_cfg.functions[self.fn_name]
 
         # dictionary of used variables
-        self.used_variables = declarations(ast.parse(src_code))
+        self.used_variables = module_declarations(src_code)
 
         # list of arguments
         self.fn_args = list(self.used_variables.keys())
 
-        self.z3 = z3.Solver()
+        self.z3 = SolverPool.acquire_solver()
+
+        # z3 constants of the variables seen in constraints, by name
+        self.symbols = {}
+
+        # counters of the work done (and avoided) by the fuzzer
+        self.stats = Counter()
 
         self.paths = None
         self.last_path = None
 
         self.options(kwargs)
-        self.process()
 
     def process(self):
         self.paths = self.get_all_paths(self.fnenter)
         self.last_path = len(self.paths)
 
+    def get_symbol(self, name):
+        if name not in self.symbols:
+            typ = identifiers_with_types([name], self.used_variables)[name]
+            self.symbols[name] = Z3_CONSTRUCTORS[typ](name)
+        return self.symbols[name]
+
     def options(self, kwargs):
         self.max_depth = kwargs.get('max_depth', MAX_DEPTH)
         self.max_tries = kwargs.get('max_tries', MAX_TRIES)
@@ -100,6 +114,8 @@ class SimpleSymbolicFuzzer(Fuzzer):
         return my_args
     
     def get_next_path(self):
+        if self.paths is None:
+            self.process()
         self.last_path -= 1
         if self.last_path == -1:
             self.last_path = len(self.paths) - 1
@@ -162,61 +178,83 @@ def to_single_assignment_predicates(path):
     env = {}
     new_path = []
     completed_path = False
-    for i, node in enumerate(path):
-        ast_node = node.cfgnode.ast_node
+    for node in path:
+        step = to_single_assignment_predicate(node, env)
+        if step is None:
+            return [], False
+        predicates, completed = step
+        completed_path = completed_path or completed
+        new_path.extend(predicates)
+    return new_path, completed_path
+
+
+def assigns(node):
+    # whether to_single_assignment_predicate updates env for the node
+    ast_node = node.cfgnode.ast_node
+    if isinstance(ast_node, ast.AnnAssign):
+        return ast_node.target.id not in {'exit', 'enter', '_if', '_while'}
+    return isinstance(ast_node, ast.Assign)
+
+
+def to_single_assignment_predicate(node, env):
+    # the predicates of one path node, renamed with and updating env, and
+    # whether it is the exit. None if the node took no valid branch.
+    ast_node = node.cfgnode.ast_node
+    new_path = []
+    new_node = None
+    completed_path = False
+    if isinstance(ast_node, ast.AnnAssign) and ast_node.target.id in {
+            'exit'}:
+        completed_path = True
         new_node = None
-        if isinstance(ast_node, ast.AnnAssign) and ast_node.target.id in {
-                'exit'}:
-            completed_path = True
-            new_node = None
-        elif isinstance(ast_node, ast.AnnAssign) and ast_node.target.id in {'enter'}:
-            args = [
-                ast.parse(
-                    "%s == _%s_0" %
-                    (a.id, a.id)).body[0].value for a in ast_node.annotation.args]
-            new_node = ast.Call(ast.Name('z3.And', None), args, [])
-        elif isinstance(ast_node, ast.AnnAssign) and ast_node.target.id in {'_if', '_while'}:
-            new_node = rename_variables(ast_node.annotation, env)
-            if node.order != 0:
-                # assert node.order == 1
-                if node.order != 1:
-                    return [], False
-                new_node = ast.Call(ast.Name('z3.Not', None), [new_node], [])
-        elif isinstance(ast_node, ast.AnnAssign):
-            if isinstance(ast_node.value, ast.List):
-                for idx, element in enumerate(ast_node.value.elts):
-                    assigned = ast_node.target.id + "_" + str(idx)
-                    val = [rename_variables(element, env)]
-                    env[assigned] = 0
-                    target = ast.Name('_%s_%d' % (assigned, env[assigned]), None)
-                    new_path.append(ast.Expr(ast.Compare(target, [ast.Eq()], val)))
-                pass
-            else:
-                assigned = ast_node.target.id
-                val = [rename_variables(ast_node.value, env)]
-                env[assigned] = 0 if assigned not in env else env[assigned] + 1
-                target = ast.Name('_%s_%d' % (assigned, env[assigned]), None)
-                new_node = ast.Expr(ast.Compare(target, [ast.Eq()], val))
-        elif isinstance(ast_node, ast.Assign):
-            if isinstance(ast_node.targets[0], ast.Subscript):
-                identifier = to_src(ast_node.targets[0])
-                assigned = identifier[:-3] + '_' + identifier[-2]
-                val = [rename_variables(ast_node.value, env)]
-                env[assigned] = 0 if assigned not in env else env[assigned] + 1
-                target = ast.Name('_%s_%d' % (assigned, env[assigned]), None)
-            else:
-                assigned = ast_node.targets[0].id
-                val = [rename_variables(ast_node.value, env)]
-                env[assigned] = 0 if assigned not in env else env[assigned] + 1
+    elif isinstance(ast_node, ast.AnnAssign) and ast_node.target.id in {'enter'}:
+        args = [
+            ast.parse(
+                "%s == _%s_0" %
+                (a.id, a.id)).body[0].value for a in ast_node.annotation.args]
+        new_node = ast.Call(ast.Name('z3.And', None), args, [])
+    elif isinstance(ast_node, ast.AnnAssign) and ast_node.target.id in {'_if', '_while'}:
+        new_node = rename_variables(ast_node.annotation, env)
+        if node.order != 0:
+            # assert node.order == 1
+            if node.order != 1:
+                return None
+            new_node = ast.Call(ast.Name('z3.Not', None), [new_node], [])
+    elif isinstance(ast_node, ast.AnnAssign):
+        if isinstance(ast_node.value, ast.List):
+            for idx, element in enumerate(ast_node.value.elts):
+                assigned = ast_node.target.id + "_" + str(idx)
+                val = [rename_variables(element, env)]
+                env[assigned] = 0
                 target = ast.Name('_%s_%d' % (assigned, env[assigned]), None)
+                new_path.append(ast.Expr(ast.Compare(target, [ast.Eq()], val)))
+            pass
+        else:
+            assigned = ast_node.target.id
+            val = [rename_variables(ast_node.value, env)]
+            env[assigned] = 0 if assigned not in env else env[assigned] + 1
+            target = ast.Name('_%s_%d' % (assigned, env[assigned]), None)
             new_node = ast.Expr(ast.Compare(target, [ast.Eq()], val))
-        elif isinstance(ast_node, (ast.Return, ast.Pass)):
-            new_node = None
+    elif isinstance(ast_node, ast.Assign):
+        if isinstance(ast_node.targets[0], ast.Subscript):
+            identifier = to_src(ast_node.targets[0])
+            assigned = identifier[:-3] + '_' + identifier[-2]
+            val = [rename_variables(ast_node.value, env)]
+            env[assigned] = 0 if assigned not in env else env[assigned] + 1
+            target = ast.Name('_%s_%d' % (assigned, env[assigned]), None)
         else:
-            continue
-            # s = "NI %s %s" % (type(ast_node), ast_node.target.id)
-            # raise Exception(s)
-        new_path.append(new_node)
+            assigned = ast_node.targets[0].id
+            val = [rename_variables(ast_node.value, env)]
+            env[assigned] = 0 if assigned not in env else env[assigned] + 1
+            target = ast.Name('_%s_%d' % (assigned, env[assigned]), None)
+        new_node = ast.Expr(ast.Compare(target, [ast.Eq()], val))
+    elif isinstance(ast_node, (ast.Return, ast.Pass)):
+        new_node = None
+    else:
+        return new_path, completed_path
+        # s = "NI %s %s" % (type(ast_node), ast_node.target.id)
+        # raise Exception(s)
+    new_path.append(new_node)
     return new_path, completed_path
 
 
@@ -1,122 +1,1156 @@
+import time
 import z3
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from collections import Counter, OrderedDict, deque
 
-from HelperFunc import to_src, used_identifiers, define_symbolic_vars, checkpoint
+import SolverPool
+import SolverCache
+import Concolic
+import PreSolver
+from HelperFunc import to_z3, z3_value, checkpoint, loop_heads, PRUNE_LEVELS, PRUNE_FRONTIER, CACHE_SIZE, \
+    SOLVER_RESET, MAX_BLOCKING, DIVERSITY, LOOP_BOUND, PREFIX_CACHE, \
+    CONCOLIC_TIMEOUT, CONCOLIC_LINES, CONCOLIC_BATCH, SLICE_CACHE, MODEL_CACHE, PRESOLVE_SAMPLES, PRESOLVE_BATCH, MODELS_PER_PATH
 from PNode import PNode
-from SymbolicFuzzer import SimpleSymbolicFuzzer, to_single_assignment_predicates, identifiers_with_types
+from PathIndex import conjuncts
+from Frontier import make_frontier
+from SymbolicFuzzer import SimpleSymbolicFuzzer
+
+
+# stands in for the timer of a phase while timing is off
+NO_TIMER = nullcontext()
+END = object()
 
 
 class AdvancedSymbolicFuzzer(SimpleSymbolicFuzzer):
     def options(self, kwargs):
         super().options(kwargs)
+        # seconds per phase, each excluding the phases running inside it
+        self.timing = kwargs.get('timing', False)
+        self.timers = Counter()
+        self.nested = []
+        # callbacks by event, see add_hook
+        self.hooks = {}
+        # paths are checked in frames pushed per constraint, those the path
+        # before was checked in are kept as far as the two agree. Every frame
+        # is [constraint, tracker, blocking clauses added in it, unsat core
+        # of the prefix ending in it or None].
+        self.incremental = kwargs.get('incremental', False)
+        self.frames = []
+        self.jobs = kwargs.get('jobs', 1)
+        # directory of the persistent solver cache
+        cache = kwargs.get('cache', None)
+        self.cache = None if cache is None else SolverCache.open_cache(cache, kwargs.get('cache_size', CACHE_SIZE))
+        # None, 'branch', 'level' or 'frontier'
+        self.prune = kwargs.get('prune', None)
+        self.prune_levels = kwargs.get('prune_levels', PRUNE_LEVELS)
+        self.prune_frontier = kwargs.get('prune_frontier', PRUNE_FRONTIER)
+        # 'function' keeps the inputs found for a path out of the solutions of
+        # the later paths of the function, 'path' solves every path on its own
+        self.solver_scope = kwargs.get('solver_scope', 'function')
+        # the solver is reset after this many checks, the most recent
+        # max_blocking blocking clauses are asserted again
+        self.solver_reset = kwargs.get('solver_reset', SOLVER_RESET)
+        self.blocking = deque(maxlen=kwargs.get('max_blocking', MAX_BLOCKING))
+        # the assignments the clauses exclude, as sets of (name, value), and
+        # the same by the names they assign, see blocked
+        self.blocked_inputs = deque(maxlen=self.blocking.maxlen)
+        self.blocked_index = {}
+        self.solver_checks = 0
+        self.feasibility = SolverPool.acquire_solver()
+        # unsat cores of solved paths by the ids of their predicates, every
+        # path and subtree containing one is infeasible without asking z3
+        self.learn_cores = kwargs.get('learn_cores', False)
+        # 'bfs', 'dfs', 'random' or 'uncovered', see Frontier, and the number
+        # of paths after which exploration stops
+        self.search = kwargs.get('search', 'bfs')
+        self.seed = kwargs.get('seed', 0)
+        self.max_paths = kwargs.get('max_paths', None)
+        # times a loop is unrolled, by default and by (function, line of
+        # the loop head)
+        self.loop_bound = kwargs.get('loop_bound', LOOP_BOUND)
+        self.loop_bounds = dict(kwargs.get('loop_bounds', ()))
+        # milliseconds per solver check, seconds for the function and the
+        # time.time() by which the whole run has to end, None for no limit
+        self.check_timeout = kwargs.get('check_timeout', None)
+        self.function_budget = kwargs.get('function_budget', None)
+        self.deadline = kwargs.get('deadline', None)
+        self.limited = any(limit is not None for limit in (self.check_timeout, self.function_budget, self.deadline))
+        self.started = time.time()
+        self.unknown_reason = None
+        # run the function on seed inputs and on the models found, paths
+        # taken by a run are covered by its input without asking z3
+        self.concolic = kwargs.get('concolic', False)
+        self.seeds = kwargs.get('seeds', None)
+        self.concolic_timeout = kwargs.get('concolic_timeout', CONCOLIC_TIMEOUT)
+        # input by the trace of every run that returned
+        self.complete_traces = {}
+        self.default_input = None
+        # the predicates of a path are split into groups sharing no variable,
+        # solved on their own and cached by the ids of their predicates
+        self.slice = kwargs.get('slice', False)
+        self.slice_cache = OrderedDict()
+        self.slice_cache_size = kwargs.get('slice_cache_size', SLICE_CACHE)
+        self.slicer = None
+        self.variables = {}
+        # models of solved paths, tried on a path before z3 is, and unsat
+        # cores, whose supersets are unsat. At most model_cache_size of each
+        # are kept, the most recent first.
+        self.model_cache = kwargs.get('model_cache', False)
+        self.models = deque(maxlen=kwargs.get('model_cache_size', MODEL_CACHE))
+        self.unsat_sets = OrderedDict()
+        # paths of linear int comparisons are tried on presolve_samples
+        # candidate inputs with numpy, PRESOLVE_BATCH paths at a time, and
+        # only those no candidate satisfies are solved
+        self.presolve = kwargs.get('presolve', False)
+        self.presolve_samples = kwargs.get('presolve_samples', PRESOLVE_SAMPLES)
+        self.linear_forms = {}
+        self.presolve_batches = 0
+        # inputs per sat path, the first is its result and the others go to
+        # its 'models', see more_models
+        self.models_per_path = kwargs.get('models_per_path', MODELS_PER_PATH)
+        self.cores = set()
+        self.core_index = {}
+        self.core_constraints = {}
+        self.feasibility_trackers = {}
+        # whether a prefix was found feasible, by the ids of its predicates,
+        # for the prefix_cache_size most recently used prefixes
+        self.feasible_prefixes = OrderedDict()
+        self.prefix_cache_size = kwargs.get('prefix_cache_size', PREFIX_CACHE)
+
+    def add_hook(self, event, callback):
+        # 'path' is called with every completed PNode, 'result' with the
+        # constraints and (test case, is unsat) of every solved path, 'phase'
+        # with a phase name and its seconds whenever one ends (which turns
+        # timing on) and 'close' with the stats and timers
+        if event == 'phase':
+            self.timing = True
+        self.hooks.setdefault(event, []).append(callback)
+
+    def emit(self, event, *args):
+        for callback in self.hooks.get(event, ()):
+            callback(*args)
+
+    def timer(self, phase):
+        return self.phase_timer(phase) if self.timing else NO_TIMER
+
+    @contextmanager
+    def phase_timer(self, phase):
+        start = time.perf_counter()
+        self.nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self.nested.pop()
+            if self.nested:
+                self.nested[-1] += elapsed
+            self.timers[phase] += own
+            self.emit('phase', phase, own)
 
-    def extract_constraints(self, path):
-        tpath, ok = to_single_assignment_predicates(path)
+    def timed(self, phase, iterator):
+        # the time spent producing the items of iterator goes to phase
+        return self.timed_items(phase, iter(iterator)) if self.timing else iterator
+
+    def timed_items(self, phase, iterator):
+        while True:
+            with self.phase_timer(phase):
+                item = next(iterator, END)
+            if item is END:
+                return
+            yield item
+
+    def compile_predicate(self, predicate):
+        return z3_value(to_z3(predicate, self.get_symbol))
+
+    def extract_constraints(self, path, partial=False):
+        # path runs from the root to its last node
+        return self.path_constraints(path[-1], partial) if path else []
+
+    def path_constraints(self, leaf, partial=False):
+        # the constraints of the path ending in leaf, compiled once per node
+        with self.timer('ssa'):
+            return self.compiled_path(leaf, partial)
+
+    def compiled_path(self, leaf, partial):
+        _, _, completed, valid = leaf.single_assignment()
+        if not valid or not (completed or partial):
+            return []
+        nodes = []
+        n = leaf
+        while n:
+            nodes.append(n)
+            n = n.parent
         res = []
-        if ok:
-            for p in tpath:
-                if p != None:
-                    res.append(to_src(p))
-        else:
-            res = []
+        for n in reversed(nodes):
+            if n.constraints is None:
+                n.constraints = [self.compile_predicate(p) for p in n.single_assignment()[0] if p is not None]
+            res.extend(n.constraints)
         return res
+
+    def time_left(self):
+        # seconds until the function budget or the deadline runs out
+        ends = []
+        if self.deadline is not None:
+            ends.append(self.deadline)
+        if self.function_budget is not None:
+            ends.append(self.started + self.function_budget)
+        return min(ends) - time.time() if ends else None
+
+    def expired(self):
+        if not self.limited:
+            return False
+        left = self.time_left()
+        return left is not None and left <= 0
+
+    def check_limit(self):
+        # milliseconds the next check may take, None for no limit
+        limits = [] if self.check_timeout is None else [self.check_timeout]
+        left = self.time_left()
+        if left is not None:
+            limits.append(max(int(left * 1000), 1))
+        return min(limits) if limits else None
+
+    def limit(self, solver):
+        if self.limited:
+            limit = self.check_limit()
+            solver.set('timeout', SolverPool.NO_TIMEOUT if limit is None else limit)
+
+    def check(self, *assumptions, solver=None):
+        solver = self.z3 if solver is None else solver
+        if self.expired():
+            # out of time, the check is not even started
+            self.stats['skipped_checks'] += 1
+            self.unknown_reason = 'time budget'
+            return z3.unknown
+        self.stats['solver_checks'] += 1
+        self.solver_checks += 1
+        self.limit(solver)
+        with self.timer('z3'):
+            result = solver.check(*assumptions)
+        self.stats['%s_checks' % result] += 1
+        if result == z3.unknown:
+            self.unknown_reason = solver.reason_unknown()
+        return result
+
+    def renew_solver(self):
+        # called between paths, when no scope is open
+        if self.solver_checks >= self.solver_reset:
+            self.stats['solver_resets'] += 1
+            self.z3.reset()
+            self.frames.clear()
+            self.z3.add(*self.blocking)
+            self.solver_checks = 0
+
+    def close(self):
+        # hands the solvers back to the pool
+        self.emit('close', self.stats, self.timers)
+        SolverPool.release_solver(self.z3)
+        SolverPool.release_solver(self.feasibility)
+        if self.slicer is not None:
+            SolverPool.release_solver(self.slicer)
+        self.z3 = self.feasibility = self.slicer = None
+
+    def assignment(self, arguments):
+        return [self.get_symbol(x) == y for x, y in arguments.items() if y is not None]
+
+    def block_model(self, arguments):
+        # exclude an already generated input from later solutions
+        assigned = self.assignment(arguments)
+        if assigned and self.solver_scope == 'function':
+            self.stats['blocking_clauses'] += 1
+            if len(self.blocking) == self.blocking.maxlen:
+                # the oldest clause is dropped, which takes a reset
+                self.solver_checks = self.solver_reset
+            self.blocking.append(z3.Not(z3.And(*assigned)))
+            if len(self.blocked_inputs) == self.blocked_inputs.maxlen:
+                self.unindex(self.blocked_inputs[0])
+            items = self.input_items(arguments)
+            self.blocked_inputs.append(items)
+            names = frozenset(name for name, value in items)
+            self.blocked_index.setdefault(names, Counter())[items] += 1
+            self.z3.add(self.blocking[-1])
+            if self.frames:
+                self.frames[-1][2].append(self.blocking[-1])
+
     def solve_path_constraint(self, path):
-        # re-initializing does not seem problematic.
-        # a = z3.Int('a').get_id() remains the same.
-        constraints = self.extract_constraints(path)
-        identifiers = [
-            c for i in constraints for c in used_identifiers(i)]  # <- changes
-        with_types = identifiers_with_types(
-            identifiers, self.used_variables)  # <- changes
-        decl = define_symbolic_vars(with_types, '')
-        exec (decl)
-
-        solutions = {}
+        models = self.fuzz_path(path, 1)
+        if not models:
+            return {}
+        self.block_model(models[0])
+        return models[0]
+
+    def fuzz_path(self, path, k=1):
+        # up to k different inputs taking the path, a PNode or the list of
+        # nodes from the root. Every input is looked for away from the
+        # previous one first. Nothing is kept in the solver afterwards.
+        constraints = self.path_constraints(path) if isinstance(path, PNode) else self.extract_constraints(path)
+        models = []
+        self.pop_frames(0)
+        self.renew_solver()
         with checkpoint(self.z3):
-            st = 'self.z3.add(%s)' % ', '.join(constraints)
-            eval(st)
-            if self.z3.check() != z3.sat:
-                return {}
-            m = self.z3.model()
-            solutions = {d.name(): m[d] for d in m.decls()}
-            my_args = {k: solutions.get(k, None) for k in self.fn_args}
-        predicate = 'z3.And(%s)' % ','.join(
-            ["%s == %s" % (k, v) for k, v in my_args.items()])
-        eval('self.z3.add(z3.Not(%s))' % predicate)
-        return my_args
+            self.z3.add(*constraints)
+            while len(models) < k:
+                arguments = self.next_model(models[-1] if models else None)
+                if arguments is None:
+                    break
+                models.append(arguments)
+                assigned = self.assignment(arguments)
+                if not assigned:
+                    break
+                self.z3.add(z3.Not(z3.And(*assigned)))
+        self.stats['models'] += len(models)
+        return models
+
+    def next_model(self, last):
+        if last:
+            away = self.away(last)
+            if away:
+                with checkpoint(self.z3):
+                    self.z3.add(z3.Or(*away))
+                    if self.check() == z3.sat:
+                        return self.model_arguments(self.z3.model())
+        if self.check() == z3.sat:
+            return self.model_arguments(self.z3.model())
+        return None
+
+    def away(self, last):
+        # predicates of which one holds for an input not close to last
+        away = []
+        for x, y in last.items():
+            if y is None:
+                continue
+            v = self.get_symbol(x)
+            if z3.is_int_value(y) or z3.is_rational_value(y):
+                away.extend([v < y - DIVERSITY, v > y + DIVERSITY])
+            else:
+                away.append(v != y)
+        return away
+
+    def more_models(self, constraints, first, k):
+        # up to k inputs taking the path other than first and the inputs
+        # blocked so far, each looked for away from the one before as in
+        # fuzz_path. They are blocked once the path is done with.
+        models = []
+        last = first
+        self.pop_frames(0)
+        self.renew_solver()
+        with checkpoint(self.z3):
+            self.z3.add(*constraints)
+            while len(models) < k:
+                assigned = self.assignment(last)
+                if not assigned:
+                    break
+                self.z3.add(z3.Not(z3.And(*assigned)))
+                last = self.next_model(last)
+                if last is None:
+                    break
+                models.append(last)
+        for arguments in models:
+            self.block_model(arguments)
+        self.stats['models'] += len(models)
+        return models
+
+    def with_models(self, results):
+        for constraints, (test_case, is_unsat) in results:
+            if not is_unsat and 'unknown' not in test_case:
+                test_case['models'] = self.more_models(constraints, test_case, self.models_per_path - 1)
+            yield constraints, (test_case, is_unsat)
 
     def get_next_path(self):
+        if self.paths is None:
+            self.process()
         self.last_path -= 1
         if self.last_path == -1:
             self.last_path = len(self.paths) - 1
         return self.paths[self.last_path]
 
     def get_all_paths(self, fenter):
-        path_lst = [PNode(0, fenter)]
-        completed = []
-        for i in range(self.max_iter):
-            new_paths = [PNode(0, fenter)]
-            for path in path_lst:
-                # explore each path once
-                if path.cfgnode.children:
-                    np = path.explore()
-                    for p in np:
-                        if path.idx > self.max_depth:
-                            break
-                        new_paths.append(p)
-                else:
-                    completed.append(path)
-            path_lst = new_paths
-        return completed + path_lst
+        return list(self.iter_paths(fenter))
+
+    def iter_paths(self, fenter):
+        # completed paths are handed out as soon as they are found, only the
+        # frontier is kept. Paths reaching max_iter nodes are handed out as
+        # they are, those beyond max_depth are dropped.
+        loops = self.find_loops(fenter)
+        frontier = make_frontier(self.search, self.seed)
+        frontier.push([PNode(0, fenter)])
+        found = 0
+        while frontier:
+            if self.expired() or (self.max_paths is not None and found >= self.max_paths):
+                # out of time or paths, the paths found so far are all there is
+                self.stats['stopped_explorations'] += 1
+                return
+            path = frontier.pop()
+            if not path.cfgnode.children or path.idx >= self.max_iter:
+                found += 1
+                self.stats['paths'] += 1
+                self.emit('path', path)
+                yield path
+                continue
+            if path.idx > self.max_depth:
+                continue
+            self.stats['expanded_nodes'] += 1
+            children = []
+            for p in path.explore(loops):
+                if self.should_check(path, frontier) and not self.can_be_satisfied(p):
+                    self.stats['pruned_paths'] += 1
+                    continue
+                if self.cores and len(path.cfgnode.children) > 1 and \
+                        self.known_core(self.path_constraints(p.parent, partial=True)) is not None:
+                    self.stats['core_pruned_paths'] += 1
+                    continue
+                children.append(p)
+            frontier.push(children)
+
+    def find_loops(self, fenter):
+        # the unroll bound of every loop by the rid of its head
+        loops = {}
+        for head in loop_heads(fenter):
+            loops[head.rid] = self.loop_bounds.get((self.fn_name, head.lineno()), self.loop_bound)
+        self.stats['loops'] += len(loops)
+        return loops
+
+    def should_check(self, path, frontier):
+        if self.prune == 'branch':
+            return len(path.cfgnode.children) > 1
+        elif self.prune == 'level':
+            return (path.idx + 1) % self.prune_levels == 0
+        elif self.prune == 'frontier':
+            return len(path.cfgnode.children) > 1 and len(frontier) > self.prune_frontier
+        return False
 
     def can_be_satisfied(self, p):
-        s2 = self.extract_constraints(p.get_path_to_root())
-        s = z3.Solver()
-        identifiers = [c for i in s2 for c in used_identifiers(i)]
-        with_types = identifiers_with_types(identifiers, self.used_variables)
-        decl = define_symbolic_vars(with_types, '')
-        exec(decl)
-        exec("s.add(z3.And(%s))" % ','.join(s2), globals(), locals())
-        return s.check() == z3.sat
-
-    def solve_constraint(self, constraints, pNodeList):
-        identifiers = [c for i in constraints for c in used_identifiers(i)]
-        with_types = identifiers_with_types(identifiers, self.used_variables)
-        decl = define_symbolic_vars(with_types, '')
-        exec(decl)
-        with checkpoint(self.z3):
-            unsat_result = {}
-            unsat_result['constraint'] = []
-            unsat_result['unsat_core'] = []
-            unsat_result['statement'] = []
-            unsat_result['path'] = [constraints]
-            unsat_path = {}
-
-            i = 0
-            for cons in constraints:
-                unsat_result['constraint'].append(str(cons))
-                assert_constraint = 'self.z3.assert_and_track(%s,"p%s")' % (cons, str(i))
-                i = i + 1
-                path_name = 'p' + str(i)
-                unsat_path[z3.Bool(path_name)] = cons
-                eval(assert_constraint)
-            if self.z3.check() != z3.sat:
-                unsat_core = self.z3.unsat_core()
-                unsat_result['unsat_core'].append("Unsat core: ")
-                for i in range(len(unsat_core)):
-                    if unsat_core[i] not in unsat_path:
-                        continue
-                    unsat_result['unsat_core'].append("\t" + str(unsat_path[unsat_core[i]]))
-                unsat_result['statement'].append("Unsat path statements: ")
-                for node in pNodeList:
-                    cfg = node.cfgnode.to_json()
-                    at = cfg['at']
-                    ast = cfg['ast']
-                    unsat_result['statement'].append("\t#line " + str(at) + ": " + str(ast))
-                return unsat_result, True
-            test_case = self.z3.model()
-            solutions = {x.name(): test_case[x] for x in test_case.decls()}
-            arguments = {y: solutions.get(y, None) for y in self.fn_args}
-        predicate = 'z3.And(%s)' % ','.join(["%s == %s" % (x, y) for x, y in arguments.items() if y is not None])
-        eval('self.z3.add(z3.Not(%s))' % predicate)
+        # every predicate is added once behind a tracker literal and a prefix
+        # is checked under the assumption of its trackers, so the solver
+        # keeps what it learned between the checks of related prefixes
+        # p itself has not taken a branch yet, its parent's choice is checked
+        constraints = self.path_constraints(p.parent, partial=True)
+        key = tuple(c.get_id() for c in constraints)
+        if key in self.feasible_prefixes:
+            self.feasible_prefixes.move_to_end(key)
+        elif self.model_cache:
+            if self.unsat_set(constraints) is not None:
+                self.feasible_prefixes[key] = (False, constraints)
+            elif next(self.satisfying_models(constraints), None) is not None:
+                self.feasible_prefixes[key] = (True, constraints)
+            if key in self.feasible_prefixes:
+                self.stats['avoided_checks'] += 1
+        if key not in self.feasible_prefixes:
+            self.stats['feasibility_checks'] += 1
+            for c in constraints:
+                if c.get_id() not in self.feasibility_trackers:
+                    tracker = z3.Bool('f%d' % c.get_id())
+                    self.feasibility.add(z3.Implies(tracker, c))
+                    self.feasibility_trackers[c.get_id()] = tracker
+            trackers = [self.feasibility_trackers[c.get_id()] for c in constraints]
+            self.limit(self.feasibility)
+            with self.timer('feasibility'):
+                result = self.feasibility.check(*trackers)
+            # only a proven contradiction prunes
+            feasible = result != z3.unsat
+            if result == z3.sat and self.model_cache:
+                # satisfies the prefix of one of its branches at least
+                self.models.append(self.model_values(self.feasibility.model()))
+            # the constraints keep their z3 ids alive
+            self.feasible_prefixes[key] = (feasible, constraints)
+        feasible = self.feasible_prefixes[key][0]
+        while len(self.feasible_prefixes) > self.prefix_cache_size:
+            self.feasible_prefixes.popitem(last=False)
+        return feasible
+
+    def learn_core(self, core, blocked=True):
+        # blocked if the core was found with the blocking clauses asserted
+        key = frozenset(c.get_id() for c in core)
+        if not self.learn_cores or not key or key in self.cores:
+            return
+        if blocked and not self.core_holds(core):
+            return
+        self.cores.add(key)
+        for c in core:
+            # keeps the ids alive
+            self.core_constraints[c.get_id()] = c
+            self.core_index.setdefault(c.get_id(), []).append(key)
+        self.stats['learned_cores'] += 1
+
+    def core_holds(self, core):
+        # a core found with blocking clauses asserted may rely on them
+        if not self.stats['blocking_clauses']:
+            return True
+        with checkpoint(self.feasibility):
+            self.feasibility.add(*core)
+            return self.feasibility.check() == z3.unsat
+
+    def known_core(self, constraints):
+        # a learned core contained in the constraints, if any
+        if not self.cores:
+            return None
+        ids = {c.get_id() for c in constraints}
+        for i in ids:
+            for key in self.core_index.get(i, ()):
+                if key <= ids:
+                    return [c for c in constraints if c.get_id() in key]
+        return None
+
+    def known_unsat(self, constraints, pNodeList):
+        core = self.known_core(constraints)
+        if core is None:
+            return None
+        self.stats['avoided_checks'] += 1
+        return self.unsat_result(constraints, core, pNodeList), True
+
+    def unsat_result(self, constraints, core, pNodeList, blocked=True):
+        self.learn_core(core, blocked)
+        unsat_result = {}
+        unsat_result['constraint'] = list(constraints)
+        unsat_result['unsat_core'] = list(core)
+        unsat_result['statement'] = self.statements(pNodeList)
+        unsat_result['path'] = [constraints]
+        return unsat_result
+
+    def unknown_result(self, constraints, reason, pNodeList):
+        # a path the solver gave up on, or that was left when time ran out
+        self.stats['unknown_paths'] += 1
+        return {'unknown': reason, 'path': [constraints], 'statement': self.statements(pNodeList)}, False
+
+    def statements(self, pNodeList):
+        # (line, statement) of every node of the path
+        statements = []
+        for node in pNodeList:
+            cfg = node.cfgnode.to_json()
+            statements.append((cfg['at'], cfg['ast']))
+        return statements
+
+    def model_arguments(self, model):
+        solutions = {x.name(): model[x] for x in model.decls()}
+        return {y: solutions.get(y, None) for y in self.fn_args}
+
+    def model_values(self, model, trackers=()):
+        tracking = {tracker.decl().get_id() for tracker in trackers}
+        return {d.name(): model[d] for d in model.decls() if d.arity() == 0 and d.get_id() not in tracking}
+
+    def solve_constraint(self, constraints, pNodeList, future=None):
+        # a path is checked on the fuzzer's solver, which holds the blocking
+        # clauses. A solution of the cache or of the worker the future stands
+        # for, see speculated, is taken instead unless its input is blocked.
+        if self.model_cache:
+            result = self.cached_model(constraints, pNodeList)
+            if result is not None:
+                return result
+        if self.slice:
+            result = self.solve_sliced(constraints, pNodeList)
+            if result is not None:
+                return result
+        key, solution = self.cached_solution(constraints)
+        if solution is None and future is not None:
+            solution = self.remote_solution(future)
+            if key is not None and solution[0] is not None:
+                self.cache.put(key, *solution)
+        if solution is not None:
+            result = self.solved_result(constraints, pNodeList, solution)
+            if result is not None:
+                return result
+        result, values = self.check_path(constraints, pNodeList)
+        if solution is None:
+            self.store_solution(key, constraints, result, values)
+        return result
+
+    def check_path(self, constraints, pNodeList):
+        # the result of the path and the values of its model, if sat
+        if self.incremental:
+            result, values = self.check_frames(constraints, pNodeList)
+        else:
+            self.renew_solver()
+            with checkpoint(self.z3):
+                trackers = []
+                for i, cons in enumerate(constraints):
+                    trackers.append(z3.Bool('p%d' % i))
+                    self.z3.assert_and_track(cons, trackers[i])
+                result, values = self.checked(constraints, pNodeList, trackers)
+        if result is not None:
+            return result, None
+        arguments = {y: values.get(y, None) for y in self.fn_args}
+        if self.model_cache:
+            self.models.append(values)
+        self.block_model(arguments)
+        return (arguments, False), values
+
+    def checked(self, constraints, pNodeList, trackers):
+        # (the unsat or unknown result, None) or (None, the values of the
+        # model) of the constraints asserted behind the trackers
+        result = self.check()
+        if result == z3.unknown:
+            return self.unknown_result(constraints, self.unknown_reason, pNodeList), None
+        if result != z3.sat:
+            core = {tracker.get_id() for tracker in self.z3.unsat_core()}
+            core = [cons for tracker, cons in zip(trackers, constraints) if tracker.get_id() in core]
+            if self.model_cache and self.core_holds(core):
+                self.remember_unsat(core)
+            return (self.unsat_result(constraints, core, pNodeList), True), None
+        model = self.z3.model()
+        return None, self.model_values(model, trackers) if self.model_cache else self.model_arguments(model)
+
+    def check_frames(self, constraints, pNodeList):
+        # as checked, in the frames of the constraints. A prefix found unsat
+        # is not checked again for the paths extending it.
+        self.renew_solver()
+        shared = 0
+        while shared < min(len(self.frames), len(constraints)) and \
+                self.frames[shared][0].get_id() == constraints[shared].get_id():
+            shared += 1
+        self.pop_frames(shared)
+        for frame in self.frames:
+            if frame[3] is not None:
+                self.stats['avoided_checks'] += 1
+                return (self.unsat_result(constraints, frame[3], pNodeList), True), None
+        for cons in constraints[shared:]:
+            tracker = z3.Bool('p%d' % len(self.frames))
+            self.z3.push()
+            self.z3.assert_and_track(cons, tracker)
+            self.frames.append([cons, tracker, [], None])
+        result, values = self.checked(constraints, pNodeList, [frame[1] for frame in self.frames])
+        if result is not None and result[1]:
+            # the prefix up to the last constraint of the core is unsat
+            core = {c.get_id() for c in result[0]['unsat_core']}
+            depth = max((i for i, c in enumerate(constraints) if c.get_id() in core), default=None)
+            if depth is not None:
+                self.frames[depth][3] = result[0]['unsat_core']
+        return result, values
+
+    def pop_frames(self, depth):
+        # the blocking clauses added in the frames popped are added again
+        # below them
+        blocking = []
+        while len(self.frames) > depth:
+            blocking.extend(self.frames.pop()[2])
+            self.z3.pop()
+        if blocking:
+            self.z3.add(*blocking)
+            if self.frames:
+                self.frames[-1][2].extend(blocking)
+
+    def solved_result(self, constraints, pNodeList, solution):
+        # the result of an (is_sat, solution) pair of SolverPool.solve_smt2,
+        # found without the blocking clauses. None if its input is blocked.
+        is_sat, value = solution
+        if is_sat is None:
+            return self.unknown_result(constraints, value, pNodeList)
+        if not is_sat:
+            core = [constraints[i] for i in value]
+            if self.model_cache:
+                self.remember_unsat(core)
+            return self.unsat_result(constraints, core, pNodeList, blocked=False), True
+        values = self.solution_values(value, constraints)
+        arguments = {y: values.get(y, None) for y in self.fn_args}
+        if self.blocked(arguments):
+            self.stats['blocked_models'] += 1
+            return None
+        if self.model_cache:
+            self.models.append(values)
+        self.block_model(arguments)
         return arguments, False
 
+    def remote_solution(self, future):
+        # the (is_sat, solution) pair a worker found
+        self.stats['remote_checks'] += 1
+        with self.timer('z3'):
+            solution = future.result()
+        self.stats['%s_checks' % {True: 'sat', False: 'unsat', None: 'unknown'}[solution[0]]] += 1
+        return solution
+
+    def model_names(self):
+        # the model cache takes every constant of a model, a result only the
+        # arguments
+        return None if self.model_cache else set(self.fn_args)
+
+    def smt2(self, expressions):
+        # SMT-LIB text of the expressions, one assertion each, made without
+        # creating terms, for the workers and the cache keys
+        decls = {}
+        for e in expressions:
+            decls.update(self.variables_of(e))
+        return '\n'.join([decls[name].sexpr() for name in sorted(decls)] +
+                         ['(assert %s)' % e.sexpr() for e in expressions])
+
+    def solution_values(self, solution, expressions):
+        # values by name of the SMT-LIB equalities of a sat solution
+        decls = dict(self.symbols)
+        for e in expressions:
+            decls.update(self.variables_of(e))
+        return {e.arg(0).decl().name(): e.arg(1) for e in z3.parse_smt2_string(solution, decls=decls)}
+
+    def cached_model(self, constraints, pNodeList):
+        # the result of a path that contains a remembered unsat core, or that
+        # a remembered model satisfies, None if there is neither
+        key = self.unsat_set(constraints)
+        if key is not None:
+            self.stats['avoided_checks'] += 1
+            core = [c for c in constraints if c.get_id() in key]
+            return self.unsat_result(constraints, core, pNodeList), True
+        for values in self.satisfying_models(constraints):
+            arguments = {y: values.get(y, None) for y in self.fn_args}
+            if not self.blocked(arguments):
+                self.stats['avoided_checks'] += 1
+                self.block_model(arguments)
+                return arguments, False
+        return None
+
+    def unsat_set(self, constraints):
+        # a remembered core contained in the constraints, if any
+        ids = {c.get_id() for c in constraints}
+        for key in reversed(self.unsat_sets):
+            if key <= ids:
+                self.stats['unsat_set_hits'] += 1
+                self.unsat_sets.move_to_end(key)
+                return key
+        return None
+
+    def satisfying_models(self, constraints):
+        # the remembered models satisfying the constraints, most recent first
+        hit = False
+        with self.timer('models'):
+            for values in reversed(self.models):
+                if all(self.satisfies(values, c) for c in constraints):
+                    hit = True
+                    self.stats['model_hits'] += 1
+                    yield values
+        if not hit:
+            self.stats['model_misses'] += 1
+
+    def satisfies(self, values, e):
+        # constants the values do not assign are given a value, as model
+        # completion does
+        pairs = []
+        for name, decl in self.variables_of(e).items():
+            value = values.get(name, None)
+            if value is None and decl.arity() == 0:
+                value = self.default_value(decl.range())
+            if value is None:
+                return False
+            pairs.append((decl(), value))
+        return z3.is_true(z3.simplify(z3.substitute(e, *pairs)))
+
+    def default_value(self, sort):
+        if sort == z3.IntSort():
+            return z3.IntVal(0)
+        if sort == z3.RealSort():
+            return z3.RealVal(0)
+        if sort == z3.BoolSort():
+            return z3.BoolVal(False)
+        if sort == z3.StringSort():
+            return z3.StringVal('')
+        return None
+
+    def remember_unsat(self, core):
+        key = frozenset(c.get_id() for c in core)
+        if not key:
+            return
+        # the core keeps its ids alive
+        self.unsat_sets[key] = core
+        self.unsat_sets.move_to_end(key)
+        while len(self.unsat_sets) > self.models.maxlen:
+            self.unsat_sets.popitem(last=False)
+
+    def solve_sliced(self, constraints, pNodeList):
+        # None if the combined model is an input found before, which leaves
+        # the path to the solver holding the blocking clauses
+        predicates, origins = [], []
+        for i, c in enumerate(constraints):
+            for p in conjuncts(c):
+                predicates.append(p)
+                origins.append(i)
+        solution = {}
+        for group in self.independent(predicates):
+            is_sat, value = self.solve_slice([predicates[j] for j in group])
+            if is_sat is None:
+                return self.unknown_result(constraints, self.unknown_reason, pNodeList)
+            if not is_sat:
+                # the constraints the predicates of the core come from
+                core = [constraints[i] for i in sorted({origins[j] for j in group if predicates[j].get_id() in value})]
+                if self.model_cache:
+                    # found without the blocking clauses
+                    self.remember_unsat(core)
+                return self.unsat_result(constraints, core, pNodeList), True
+            solution.update(value)
+        arguments = {y: solution.get(y, None) for y in self.fn_args}
+        if self.blocked(arguments):
+            self.stats['blocked_slices'] += 1
+            return None
+        self.block_model(arguments)
+        return arguments, False
+
+    def independent(self, predicates):
+        # the indices of the predicates in groups sharing no variable
+        parent = list(range(len(predicates)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        first = {}
+        for i, p in enumerate(predicates):
+            for name in self.variables_of(p):
+                if name in first:
+                    parent[find(i)] = find(first[name])
+                else:
+                    first[name] = i
+        groups = {}
+        for i in range(len(predicates)):
+            groups.setdefault(find(i), []).append(i)
+        self.stats['slices'] += len(groups)
+        return list(groups.values())
+
+    def variables_of(self, e):
+        # the declarations of the constants and functions of e by name
+        if e.get_id() not in self.variables:
+            names = {}
+            seen = set()
+            stack = [e]
+            while stack:
+                n = stack.pop()
+                if n.get_id() in seen:
+                    continue
+                seen.add(n.get_id())
+                if z3.is_app(n):
+                    if n.decl().kind() == z3.Z3_OP_UNINTERPRETED:
+                        names[n.decl().name()] = n.decl()
+                    stack.extend(n.children())
+            # the expression keeps its id alive
+            self.variables[e.get_id()] = (e, names)
+        return self.variables[e.get_id()][1]
+
+    def solve_slice(self, predicates):
+        # (True, values by name), (False, ids of the core predicates) or
+        # (None, None) when z3 gave up
+        key = frozenset(p.get_id() for p in predicates)
+        if key in self.slice_cache:
+            self.stats['slice_hits'] += 1
+            self.slice_cache.move_to_end(key)
+            return self.slice_cache[key][1]
+        if self.slicer is None:
+            self.slicer = SolverPool.acquire_solver()
+        with checkpoint(self.slicer):
+            trackers = []
+            for i, p in enumerate(predicates):
+                trackers.append(z3.Bool('p%d' % i))
+                self.slicer.assert_and_track(p, trackers[i])
+            result = self.check(solver=self.slicer)
+            if result == z3.unknown:
+                return None, None
+            if result == z3.sat:
+                model = self.slicer.model()
+                value = True, {d.name(): model[d] for d in model.decls()}
+            else:
+                core = {tracker.get_id() for tracker in self.slicer.unsat_core()}
+                value = False, {p.get_id() for tracker, p in zip(trackers, predicates) if tracker.get_id() in core}
+        # the predicates keep their ids alive
+        self.slice_cache[key] = (predicates, value)
+        while len(self.slice_cache) > self.slice_cache_size:
+            self.slice_cache.popitem(last=False)
+        return value
+
+    def blocked(self, arguments):
+        # whether a blocking clause rules the input out. A blocked input
+        # rules out every input assigning its names the same values, one
+        # lookup per set of names assigned by blocked inputs
+        values = dict(self.input_items(arguments))
+        for names, inputs in self.blocked_index.items():
+            if names.issubset(values) and frozenset((name, values[name]) for name in names) in inputs:
+                return True
+        return False
+
+    def unindex(self, items):
+        names = frozenset(name for name, value in items)
+        inputs = self.blocked_index[names]
+        inputs[items] -= 1
+        if not inputs[items]:
+            del inputs[items]
+            if not inputs:
+                del self.blocked_index[names]
+
+    def input_items(self, arguments):
+        # values are compared in their normal form
+        return frozenset((x, y.sexpr()) for x, y in arguments.items() if y is not None)
+
+    def solve_constraints(self, paths):
+        # paths yields (constraints, pNodeList) pairs, the results come out
+        # one at a time and in the same order
+        pNodeLists = deque()
+        paths = self.remembered(paths, pNodeLists)
+        solve = self.solve_concolic if self.concolic else self.solve_each
+        results = self.solve_presolved(paths, solve) if self.presolve else solve(paths)
+        if self.models_per_path > 1:
+            results = self.with_models(results)
+        results = self.with_statements(self.timed('solve', results), pNodeLists)
+        return self.emitted(results) if 'result' in self.hooks else results
+
+    def remembered(self, paths, pNodeLists):
+        # the node lists of the paths taken but not yet solved
+        for constraints, pNodeList in paths:
+            pNodeLists.append(pNodeList)
+            yield constraints, pNodeList
+
+    def with_statements(self, results, pNodeLists):
+        # sat results get the statements of their path, as the others have
+        for constraints, (test_case, is_unsat) in results:
+            pNodeList = pNodeLists.popleft()
+            if not is_unsat and 'unknown' not in test_case:
+                test_case['statement'] = self.statements(pNodeList)
+            yield constraints, (test_case, is_unsat)
+
+    def solve_presolved(self, paths, solve):
+        # the paths of a batch that a candidate satisfies get it as their
+        # input, the others are handed to solve together
+        paths = iter(paths)
+        while True:
+            batch = list(islice(paths, PRESOLVE_BATCH))
+            if not batch:
+                return
+            with self.timer('presolve'):
+                witnesses = self.presolve_batch(batch)
+            rest = solve(iter([path for path, arguments in zip(batch, witnesses) if arguments is None]))
+            for (constraints, pNodeList), arguments in zip(batch, witnesses):
+                yield (constraints, (arguments, False)) if arguments is not None else next(rest)
+
+    def presolve_batch(self, batch):
+        # the input found for every path, None if there is none. The inputs
+        # are blocked in the order of the paths.
+        witnesses = [None] * len(batch)
+        systems = []
+        for i, (constraints, pNodeList) in enumerate(batch):
+            system = self.linear_system(constraints)
+            if system is None:
+                self.stats['presolve_skipped'] += 1
+            else:
+                systems.append((i, system))
+        if not systems:
+            return witnesses
+        self.presolve_batches += 1
+        names, candidates, satisfied = PreSolver.search([system[1] for i, system in systems],
+                                                        self.presolve_samples, self.seed + self.presolve_batches)
+        for (i, system), column in zip(systems, satisfied.T):
+            for row in column.nonzero()[0][:PreSolver.TRIES]:
+                values = PreSolver.assignment(names, candidates[row], system[0], system[1])
+                arguments = self.presolved_arguments(system, values)
+                if arguments is not None and not self.blocked(arguments):
+                    self.stats['presolved'] += 1
+                    self.stats['avoided_checks'] += 1
+                    self.block_model(arguments)
+                    witnesses[i] = arguments
+                    break
+            else:
+                self.stats['presolve_misses'] += 1
+        return witnesses
+
+    def linear_system(self, constraints):
+        # (definitions, atoms, atoms before elimination) of the path, see
+        # PreSolver.eliminate, None if a constraint is not linear
+        atoms = []
+        for c in constraints:
+            if c.get_id() not in self.linear_forms:
+                # the constraint keeps its id alive
+                self.linear_forms[c.get_id()] = (c, PreSolver.linear_atoms(c))
+            forms = self.linear_forms[c.get_id()][1]
+            if forms is None:
+                return None
+            atoms.extend(forms)
+        if not atoms:
+            return None
+        system = PreSolver.eliminate(atoms, set(self.fn_args))
+        return None if system is None else system + (atoms,)
+
+    def presolved_arguments(self, system, values):
+        # the input of the values, None if they fail a predicate of the path
+        # as it was before elimination
+        if not PreSolver.holds(system[2], values):
+            self.stats['presolve_rejected'] += 1
+            return None
+        return {y: z3.IntVal(values[y]) if y in values else None for y in self.fn_args}
+
+    def emitted(self, results):
+        for constraints, result in results:
+            self.emit('result', constraints, result)
+            yield constraints, result
+
+    def solve_concolic(self, paths):
+        # paths a concrete run took get its input as their witness. The
+        # others are solved together, CONCOLIC_BATCH paths at a time, and the
+        # models of a batch are run before the next batch is looked at.
+        if self.default_input is None:
+            inputs = self.seed_inputs()
+            self.default_input = inputs[-1]
+            self.run_concrete(inputs)
+        paths = iter(paths)
+        while True:
+            batch = list(islice(paths, CONCOLIC_BATCH))
+            if not batch:
+                return
+            witnesses = [self.concolic_arguments(constraints, pNodeList) for constraints, pNodeList in batch]
+            rest = self.solve_each(iter([path for path, arguments in zip(batch, witnesses) if arguments is None]))
+            inputs = []
+            for (constraints, pNodeList), arguments in zip(batch, witnesses):
+                if arguments is not None:
+                    yield constraints, (arguments, False)
+                    continue
+                constraints, (test_case, is_unsat) = next(rest)
+                if not is_unsat and 'unknown' not in test_case:
+                    inputs.append(self.model_input(test_case))
+                yield constraints, (test_case, is_unsat)
+            self.run_concrete(inputs)
+
+    def concolic_arguments(self, constraints, pNodeList):
+        # the blocked input of a run that took the path, if any. A run can
+        # take a path with an input its constraints rule out, as when they
+        # pin an argument the code assigns before reading it, or with an
+        # input already given to another path; the path is solved then.
+        witness = self.witness(pNodeList)
+        if witness is None:
+            return None
+        arguments = {y: z3_value(witness[y]) if y in witness else None for y in self.fn_args}
+        if self.blocked(arguments) or not self.admits(constraints, arguments):
+            self.stats['concolic_rejected'] += 1
+            return None
+        self.stats['concolic_covered'] += 1
+        self.block_model(arguments)
+        return arguments
+
+    def admits(self, constraints, arguments):
+        with checkpoint(self.feasibility):
+            self.feasibility.add(*constraints)
+            self.feasibility.add(*self.assignment(arguments))
+            return self.feasibility.check() == z3.sat
+
+    def parameters(self):
+        for name, source, params in Concolic.program(self.src_code):
+            if name == self.fn_name:
+                return params
+        return ()
+
+    def seed_inputs(self):
+        # the seeds of the function with the parameters they leave out, and
+        # an input of default values
+        params = self.parameters()
+        seeds = [] if self.seeds is None else Concolic.load_seeds(self.seeds).get(self.fn_name, [])
+        inputs = []
+        for seed in seeds + [{}]:
+            inputs.append({p: seed.get(p, Concolic.DEFAULTS.get(typ)) for p, typ in params})
+        return inputs
+
+    def model_input(self, test_case):
+        inputs = dict(self.default_input)
+        for p in inputs:
+            if test_case.get(p) is not None:
+                inputs[p] = Concolic.python_value(test_case[p])
+        return inputs
+
+    def run_concrete(self, inputs):
+        inputs = [i for i in inputs if None not in i.values()]
+        if not inputs:
+            return
+        with self.timer('concrete'):
+            runs = Concolic.run(Concolic.program(self.src_code), self.fn_name, inputs, self.concolic_timeout,
+                                CONCOLIC_LINES, self.jobs)
+        for arguments, result in zip(inputs, runs):
+            self.stats['concrete_runs'] += 1
+            if result is None:
+                self.stats['concrete_timeouts'] += 1
+                continue
+            trace, returned = result
+            signature = []
+            for line in trace:
+                if not signature or signature[-1] != line:
+                    signature.append(line)
+            if returned:
+                self.complete_traces.setdefault(tuple(signature), arguments)
+
+    def witness(self, pNodeList):
+        # the input of a run that took the path, if any
+        signature = self.concrete_signature(pNodeList)
+        if signature is None:
+            return None
+        return self.complete_traces.get(signature)
+
+    def concrete_signature(self, pNodeList):
+        # the lines a run taking the path traces. Only paths that end at the
+        # exit of the function are solved, so None if the path does not, as
+        # when it goes on past the exit.
+        lines = []
+        for i, node in enumerate(pNodeList):
+            if node.cfgnode is self.fnexit:
+                return tuple(lines) if i == len(pNodeList) - 1 else None
+            if i == 0:
+                continue
+            line = node.cfgnode.lineno()
+            if not lines or lines[-1] != line:
+                lines.append(line)
+        return None
+
+    def solve_each(self, paths):
+        for constraints, pNodeList, future in self.speculated(paths):
+            result = self.known_unsat(constraints, pNodeList)
+            if result is None:
+                result = self.solve_constraint(constraints, pNodeList, future)
+            if future is not None:
+                # not needed after all
+                future.cancel()
+            yield constraints, result
+
+    def speculated(self, paths):
+        # (constraints, pNodeList, future) for the paths. With jobs > 1 the
+        # paths ahead are solved in the workers while a path is settled, and
+        # their futures come out in the order of the paths, so the results do
+        # not depend on the scheduling of the workers. Sliced and incremental
+        # solving stay in process.
+        if self.jobs <= 1 or self.slice or self.incremental:
+            for constraints, pNodeList in paths:
+                yield constraints, pNodeList, None
+            return
+        pool = SolverPool.get_pool(self.jobs)
+        pending = deque()
+        try:
+            for constraints, pNodeList in paths:
+                future = None
+                if self.known_core(constraints) is None and not self.expired():
+                    smt2 = self.smt2(constraints)
+                    if self.cache is None or not self.cache.has(self.cache_key(smt2)):
+                        future = pool.submit(SolverPool.solve_smt2, (smt2, self.model_names(), self.check_limit()))
+                pending.append((constraints, pNodeList, future))
+                if len(pending) >= self.jobs * SolverPool.WINDOW:
+                    yield pending.popleft()
+            while pending:
+                yield pending.popleft()
+        finally:
+            for constraints, pNodeList, future in pending:
+                if future is not None:
+                    future.cancel()
+
+    def cached_solution(self, constraints):
+        # the cache key and the cached solution, if any
+        if self.cache is None:
+            return None, None
+        key = self.cache_key(self.smt2(constraints))
+        solution = self.cache.get(key)
+        self.stats['cache_misses' if solution is None else 'cache_hits'] += 1
+        return key, solution
+
+    def cache_key(self, smt2):
+        names = self.model_names()
+        return self.cache.key(smt2, ['*'] if names is None else names)
+
+    def store_solution(self, key, constraints, result, values=None):
+        # values are those of the whole model, if there is more to it than
+        # the input
+        test_case, is_unsat = result
+        if key is None or 'unknown' in test_case:
+            return
+        if not is_unsat:
+            values = test_case if values is None else values
+            self.cache.put(key, True, ''.join('(assert (= %s %s))' % (k, v.sexpr())
+                                              for k, v in values.items() if v is not None))
+        elif not self.stats['blocking_clauses']:
+            # with blocking clauses a path can be unsat only because of the
+            # models of earlier paths, which is not worth remembering
+            core = {c.get_id() for c in test_case['unsat_core']}
+            self.cache.put(key, False, [i for i, c in enumerate(constraints) if c.get_id() in core])
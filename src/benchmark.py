@@ -0,0 +1,234 @@
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import astor
+
+import main
+import FrontEnd
+from PathIndex import PathIndex
+from advancedfuzzer import AdvancedSymbolicFuzzer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PHASES = ['create_CFG', 'get_all_paths', 'extract_constraints', 'solve_constraint', 'report']
+
+# name: generator parameters
+SUITE = {
+    'ifs': dict(ifs=4),
+    'nested': dict(ifs=1, nesting=4),
+    'loops': dict(ifs=0, loops=1, bound=2),
+    'calls': dict(ifs=1, chain=3),
+    'lists': dict(ifs=2, size=16),
+    'mixed': dict(ifs=1, loops=1, bound=2, chain=2, size=4),
+}
+
+# generator parameters the size options set, by option: N conditionals, D
+# nesting, L functions in the call chain, B loop iterations and S list
+# elements per function
+SIZES = {'ifs': 'ifs', 'nesting': 'nesting', 'chain': 'chain', 'loop_bound': 'bound', 'size': 'size'}
+# what a phase or the peak memory may exceed the baseline by besides the
+# threshold, so that tiny values do not fail on noise. Seconds and kilobytes.
+MARGIN = 0.02
+MEMORY_MARGIN = 4096
+
+
+def case_params(name, sizes, scale):
+    # the parameters of a case with the sizes given replacing its own, the
+    # size parameters it uses multiplied by scale. Conditionals and nesting
+    # multiply the paths, so they are scaled in steps of one.
+    params = dict(SUITE[name])
+    for key, value in sizes.items():
+        if value is not None:
+            params[key] = value
+    for key in SIZES.values():
+        if params.get(key):
+            params[key] = max(1, round(params[key] * scale))
+    return params
+
+
+def generate(ifs=1, nesting=1, loops=0, bound=2, chain=1, size=0):
+    # a module of the call chain f1 -> ... -> f<chain>, each function
+    # calling the next one. Every function has ifs sequential conditionals
+    # nested nesting deep, loops loops of bound iterations and a list literal
+    # of size elements. The paths of a caller run on through its callees, so
+    # the number of paths grows quickly with the chain, up to the depth.
+    lines = []
+    for f in range(1, chain + 1):
+        lines.append('def f%d(a: int, b: int):' % f)
+        lines.append('    x: int = 0')
+        if size:
+            lines.append('    l: list[int] = [%s]' % ', '.join(str(i) for i in range(size)))
+        for i in range(ifs):
+            for d in range(nesting):
+                indent = '    ' * (d + 1)
+                lines.append('%sif %s > %d:' % (indent, 'a' if (i + d) % 2 == 0 else 'b', i * nesting + d))
+            lines.append('%sx = x + %d' % ('    ' * (nesting + 1), i + 1))
+        if size:
+            # subscripts are renamed by their last digit
+            lines.append('    if a > l[%d]:' % min(size - 1, 9))
+            lines.append('        x = x - l[0]')
+        for i in range(loops):
+            lines.append('    i%d: int = 0' % i)
+            lines.append('    while i%d < %d:' % (i, bound))
+            lines.append('        i%d = i%d + 1' % (i, i))
+            lines.append('        x = x + b')
+        if f < chain:
+            lines.append('    c: int = %d' % f)
+            lines.append('    f%d(c, b)' % (f + 1))
+        lines.append('    return x')
+        lines.append('')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def run_case(source, depth, kwargs):
+    # runs in a fresh process, so that the peak memory is that of the case
+    timings = dict.fromkeys(PHASES, 0.0)
+    start = time.perf_counter()
+    astree = ast.parse(source)
+    src_code = astor.to_source(astree)
+    function_names = [node.name for node in ast.walk(astree) if isinstance(node, ast.FunctionDef)]
+    py_cfg = FrontEnd.module_CFG(astree)
+    timings['create_CFG'] += time.perf_counter() - start
+
+    results = []
+    paths = 0
+    for func_name in function_names:
+        fuzzer = AdvancedSymbolicFuzzer(func_name, src_code, py_cfg, max_depth=depth, **kwargs)
+        start = time.perf_counter()
+        leaves = fuzzer.get_all_paths(fuzzer.fnenter)
+        timings['get_all_paths'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = PathIndex()
+        extracted = []
+        for leaf in leaves:
+            path = leaf.get_path_to_root()
+            constraints = fuzzer.extract_constraints(path)
+            if len(constraints) > 1 and index.add(constraints):
+                extracted.append((constraints, path))
+        timings['extract_constraints'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        test_cases = []
+        for constraints, (test_case, is_unsat) in fuzzer.solve_constraints(iter(extracted)):
+            test_case['constraint'] = constraints
+            test_cases.append(test_case)
+        timings['solve_constraint'] += time.perf_counter() - start
+        fuzzer.close()
+        results.append({func_name: test_cases})
+        paths += len(extracted)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, 'reports'))
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            start = time.perf_counter()
+            main.report(results, 'benchmark.py')
+            timings['report'] += time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    # kilobytes on Linux, bytes on macOS
+    peak = None if resource is None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return timings, paths, peak
+
+
+def benchmark(cases, depth, repeat, kwargs, sizes={}, scale=1.0):
+    # the median of repeat runs of every phase and of the peak memory
+    results = {}
+    for name in cases:
+        params = case_params(name, sizes, scale)
+        source = generate(**params)
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                runs.append(pool.submit(run_case, source, depth, kwargs).result())
+        timings = {phase: statistics.median(run[0][phase] for run in runs) for phase in PHASES}
+        peaks = [run[2] for run in runs if run[2] is not None]
+        results[name] = dict(params=params, depth=depth, phases=timings, total=sum(timings.values()),
+                             paths=runs[0][1], peak_memory=statistics.median(peaks) if peaks else None)
+        print('%-8s %s  paths %d  peak %s' % (name, '  '.join('%s %.3fs' % (phase, timings[phase]) for phase in PHASES),
+                                              runs[0][1], results[name]['peak_memory']))
+    return results
+
+
+def regressions(results, baseline, threshold, margin=MARGIN, memory_threshold=None, memory_margin=MEMORY_MARGIN):
+    # (case, phase or 'peak_memory', baseline value, value) of everything
+    # above the baseline by more than the threshold, as a fraction, plus the
+    # margin. Cases run with other parameters than in the baseline are not
+    # compared.
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    slower = []
+    for name, result in results.items():
+        if name not in baseline or baseline[name].get('params') != result['params'] or \
+                baseline[name].get('depth', result['depth']) != result['depth']:
+            continue
+        for phase in PHASES:
+            before, now = baseline[name]['phases'].get(phase), result['phases'][phase]
+            if before is not None and now > before * (1 + threshold) + margin:
+                slower.append((name, phase, before, now))
+        before, now = baseline[name].get('peak_memory'), result['peak_memory']
+        if before is not None and now is not None and now > before * (1 + memory_threshold) + memory_margin:
+            slower.append((name, 'peak_memory', before, now))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the phases of the fuzzer on generated programs')
+    parser.add_argument("-o", "--output", help="write the results as JSON", type=str)
+    parser.add_argument("-d", "--depth", help="max depth", type=int, default=10)
+    parser.add_argument("--case", help="run only these cases", choices=sorted(SUITE), nargs='+')
+    parser.add_argument("--repeat", help="runs per case, the median counts", type=int, default=5)
+    parser.add_argument("-N", "--ifs", help="conditionals per function in every case", type=int)
+    parser.add_argument("-D", "--nesting", help="depth the conditionals are nested to in every case", type=int)
+    parser.add_argument("-L", "--chain", help="functions in the call chain of every case", type=int)
+    parser.add_argument("-B", "--loop-bound", help="iterations of the loops of the cases", type=int)
+    parser.add_argument("-S", "--size", help="elements of the lists of the cases", type=int)
+    parser.add_argument("--scale", help="multiply the sizes the cases use by this factor", type=float, default=1.0)
+    parser.add_argument("--baseline", help="JSON results to compare with", type=str)
+    parser.add_argument("--save-baseline", help="write the results to the baseline file", action="store_true")
+    parser.add_argument("--threshold", help="allowed slowdown of a phase against the baseline, as a fraction",
+                        type=float, default=0.25)
+    parser.add_argument("--margin", help="seconds a phase may exceed the baseline by besides the threshold",
+                        type=float, default=MARGIN)
+    parser.add_argument("--memory-threshold", help="allowed growth of the peak memory against the baseline, as a "
+                                                   "fraction, the threshold by default", type=float)
+    parser.add_argument("--memory-margin", help="kilobytes the peak memory may exceed the baseline by besides the "
+                                                "threshold", type=int, default=MEMORY_MARGIN)
+    parser.add_argument("--incremental", help="solve paths sharing a prefix incrementally", action="store_true")
+    parser.add_argument("-j", "--jobs", help="solve the paths of a function in N worker processes", type=int, default=1)
+    parser.add_argument("--prune", help="drop infeasible branches while exploring", choices=['branch', 'level', 'frontier'])
+    args = parser.parse_args()
+
+    sizes = {SIZES[option]: getattr(args, option) for option in SIZES}
+    results = benchmark(args.case or list(SUITE), args.depth, args.repeat,
+                        dict(incremental=args.incremental, jobs=args.jobs, prune=args.prune), sizes, args.scale)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+    elif args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.threshold, args.margin, args.memory_threshold,
+                                 args.memory_margin)
+        for name, phase, before, now in slower:
+            if phase == 'peak_memory':
+                print('REGRESSION %s %s: %dkB -> %dkB' % (name, phase, before, now))
+            else:
+                print('REGRESSION %s %s: %.3fs -> %.3fs' % (name, phase, before, now))
+        if slower:
+            sys.exit(1)
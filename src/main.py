@@ -1,239 +1,558 @@
+import os
+import glob
 import argparse
 import ast
-import platform
+import json
+import time
+import hashlib
+import tempfile
+import traceback
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import z3
 
-import astor
-from fuzzingbook.ControlFlow import PyCFG
 from advancedfuzzer import AdvancedSymbolicFuzzer
 
 import HelperFunc
+import SolverCache
+import FrontEnd
+import Concolic
+import PreSolver
+from ResultStore import ResultStore
+from PathIndex import PathIndex
+from ReportSink import ReportSink, render_text
 
 
-def main(args):
-    HelperFunc.MAX_DEPTH = args.depth
-
-    results = []
-    astree = astor.parse_file(args.input)
-    src_code = astor.to_source(astree)
-    py_cfg = PyCFG()
-    function_names, function_CFGs = create_CFG(py_cfg, astree)
+# counters and seconds per phase of the whole run, the fuzzers' included
+run_stats = Counter()
+run_timers = Counter()
 
-    for i in range(len(function_names)):
-        # print("###################################" + function_names[i] + "###################################")
-        results += analyze(function_names[i], src_code, py_cfg, function_names)
-    report(results, args.input)
 
+def main(args):
+    deadline = None if args.time_limit is None else time.time() + args.time_limit
+    HelperFunc.MAX_DEPTH = args.depth
+    HelperFunc.CALLEE_CACHE_SIZE = args.callee_cache_size
+    if args.cache and args.clear_cache:
+        SolverCache.open_cache(args.cache, args.cache_size).clear()
 
-def create_CFG(py_cfg, astree):
-    function_names = []
-    function_CFGs = {}
+    if len(args.input) == 1 and os.path.isfile(args.input[0]):
+        analyze_file(args, args.input[0], args.jsonl, deadline)
+    else:
+        batch(args, input_files(args.input), deadline)
+    close_pools()
+    if args.stats:
+        write_stats(args.stats)
+
+
+def input_files(inputs):
+    # the python files named by files, directories and glob patterns
+    files = []
+    for spec in inputs:
+        if os.path.isdir(spec):
+            files.extend(sorted(glob.glob(os.path.join(spec, '**', '*.py'), recursive=True)))
+        elif glob.has_magic(spec):
+            files.extend(sorted(f for f in glob.glob(spec, recursive=True) if f.endswith('.py')))
+        else:
+            files.append(spec)
+    return list(dict.fromkeys(files))
+
+
+def batch(args, files, deadline):
+    # every file is analyzed in this process, sharing the worker pools. A
+    # file that fails is recorded in the summary and the batch goes on.
+    summary = []
+    for input in files:
+        start = time.perf_counter()
+        entry = {'file': input}
+        jsonl = None
+        if args.jsonl is not None:
+            os.makedirs(args.jsonl, exist_ok=True)
+            jsonl = entry['jsonl'] = os.path.join(args.jsonl, HelperFunc.unique_name(input) + '.jsonl')
+        if not args.no_text_report:
+            entry['report'] = report_filename(input, unique=True)
+        try:
+            counts = analyze_file(args, input, jsonl, deadline, entry.get('report'))
+            entry.update(paths=sum(counts.values()), sat=counts['sat'], unsat=counts['unsat'],
+                         unknown=counts['unknown'])
+        except Exception as e:
+            run_stats['failed_files'] += 1
+            entry['error'] = '%s: %s' % (type(e).__name__, e)
+            entry['traceback'] = traceback.format_exc()
+        entry['seconds'] = time.perf_counter() - start
+        summary.append(entry)
+        print(summary_line(entry))
+    with open(args.summary, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def summary_line(entry):
+    if 'error' in entry:
+        return '%-40s FAILED %s' % (entry['file'], entry['error'])
+    return '%-40s paths %d  sat %d  unsat %d  unknown %d  %.3fs' % (
+        entry['file'], entry['paths'], entry['sat'], entry['unsat'], entry['unknown'], entry['seconds'])
+
+
+def analyze_file(args, input, jsonl, deadline, report=None):
+    # writes the record stream and the text report of one file, to report or
+    # else to the report_filename of the input, returns the number of paths
+    # by status
+    start = time.perf_counter()
+    front_end = FrontEnd.load(input, args.front_end_cache)
+    astree, src_code, function_names = front_end.astree, front_end.src_code, front_end.function_names
+    run_stats['front_end_' + front_end.origin] += 1
+    run_timers['parse'] += time.perf_counter() - start
+    options = dict(incremental=args.incremental, jobs=args.jobs, prune=args.prune,
+                   prune_levels=args.prune_levels, prune_frontier=args.prune_frontier,
+                   prefix_cache_size=args.prefix_cache_size,
+                   cache=args.cache, cache_size=args.cache_size, solver_scope=args.solver_scope,
+                   solver_reset=args.solver_reset, learn_cores=args.learn_cores, search=args.search, seed=args.seed,
+                   max_paths=args.max_paths, loop_bound=args.loop_bound, loop_bounds=loop_bounds(args.loop_bounds),
+                   concolic=args.concolic, seeds=args.seeds, concolic_timeout=args.concolic_timeout,
+                   slice=args.slice, slice_cache_size=args.slice_cache_size, model_cache=args.model_cache,
+                   model_cache_size=args.model_cache_size, presolve=args.presolve,
+                   presolve_samples=args.presolve_samples, models_per_path=args.models_per_path)
+
+    # with a result store only the functions whose fingerprint changed since
+    # the previous run, and so their callers, are analyzed again
+    graph = call_graph(astree, function_names)
+    fingerprints = function_fingerprints(astree, graph, front_end.declarations, dict(options, depth=args.depth))
+    store = ResultStore(args.reuse, input) if args.reuse else None
+    stale = [name for name in dict.fromkeys(function_names) if store is None or fingerprints[name] not in store]
+    # timing and time limits are not part of the fingerprints, results cut
+    # short by a limit are not stored
+    options.update(timing=args.stats is not None, check_timeout=args.check_timeout,
+                   function_budget=args.function_budget, deadline=deadline)
+
+    # every path goes to the record stream as soon as it is solved, the text
+    # report is rendered from the stream. Results are only held for the
+    # functions stored or named more than once; the deduplication of paths
+    # still keeps a key per distinct path of the function being analyzed,
+    # see PathIndex.
+    stream = jsonl
+    if stream is None and not args.no_text_report:
+        fd, stream = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+    sink = ReportSink(stream if stream is not None else os.devnull)
+    module_results = None
+    try:
+        only = {callee for name in stale for callee in reachable(graph, name)}
+        if stale and args.function_jobs > 1:
+            module_results = analyze_module(src_code, only, function_names, args.function_jobs,
+                                            list(stale), **options)
+        elif stale:
+            start = time.perf_counter()
+            py_cfg = front_end.cfg(only)
+            run_timers['create_CFG'] += time.perf_counter() - start
+
+        # only the results of functions named more than once are kept for later
+        repeated = {name: None for name in function_names if function_names.count(name) > 1}
+        for func_name in function_names:
+            if repeated.get(func_name) is not None:
+                results = repeated[func_name]
+                sink.write_results(results)
+            elif func_name in stale:
+                if args.function_jobs > 1:
+                    _, results = next(module_results)
+                    sink.write_results(results)
+                else:
+                    results = analyze(func_name, src_code, py_cfg, function_names, sink=sink,
+                                      keep=store is not None or func_name in repeated, **options)
+                stale.remove(func_name)
+                if store is not None and not any('unknown' in test_case for result in results
+                                                 for test_cases in result.values() for test_case in test_cases):
+                    store.put(fingerprints[func_name], results)
+            else:
+                results = store.get(fingerprints[func_name])
+                sink.write_results(results)
+                run_stats['reused_functions'] += 1
+            if func_name in repeated:
+                repeated[func_name] = results
+        sink.close()
+        if store is not None:
+            store.save()
+        if not args.no_text_report:
+            start = time.perf_counter()
+            render_text(stream, report or report_filename(input))
+            run_timers['report'] += time.perf_counter() - start
+    finally:
+        sink.close()
+        if module_results is not None:
+            module_results.close()
+        if jsonl is None and stream is not None:
+            os.remove(stream)
+    return sink.counts
+
+
+def write_stats(filename):
+    stats = {'counters': dict(run_stats), 'seconds': dict(run_timers)}
+    with open(filename, 'w') as f:
+        json.dump(stats, f, indent=2, sort_keys=True)
+
+
+def loop_bounds(specs):
+    # FUNC:LINE=N, with the line of the loop as the report gives it. Options
+    # are hashed, so the bounds are a tuple of ((FUNC, LINE), N) pairs.
+    bounds = {}
+    for spec in specs:
+        head, bound = spec.split('=')
+        func_name, line = head.rsplit(':', 1)
+        bounds[func_name, int(line)] = int(bound)
+    return tuple(sorted(bounds.items()))
+
+
+def reachable(graph, name):
+    # name and every function it calls, directly or not
+    seen = [name]
+    for caller in seen:
+        seen.extend(callee for callee in sorted(graph.get(caller, ())) if callee not in seen)
+    return seen
+
+
+def function_fingerprints(astree, graph, declarations, options):
+    # a function changes when its code, the code of a function it reaches,
+    # the variable/type table of the module, which its arguments come from,
+    # or the analysis options change
+    sources = {node.name: ast.dump(node) for node in ast.walk(astree) if isinstance(node, ast.FunctionDef)}
+    fingerprints = {}
+    for name in sources:
+        text = '\n'.join([repr(sorted(options.items())), repr(sorted(declarations.items()))] +
+                          [sources[n] for n in reachable(graph, name) if n in sources])
+        fingerprints[name] = hashlib.sha256(text.encode()).hexdigest()
+    return fingerprints
+
+
+def constant_value(constraint, variable=None):
+    # value of a `variable == number` constraint, None for anything else
+    if z3.is_eq(constraint) and (variable is None or constraint.arg(0).eq(variable)):
+        value = constraint.arg(1)
+        if z3.is_int_value(value):
+            return value.as_long()
+        elif z3.is_rational_value(value):
+            return float(value.as_fraction())
+    return None
+
+
+def call_graph(astree, function_names):
+    graph = {}
     for node in ast.walk(astree):
-        if isinstance(node, ast.FunctionDef):  # if node is a function in python
-            function_names.append(node.name)
-            function_CFGs[node.name] = py_cfg.gen_cfg(astor.to_source(node))
-    return function_names, function_CFGs
+        if isinstance(node, ast.FunctionDef):
+            graph.setdefault(node.name, set()).update(
+                n.func.id for n in ast.walk(node)
+                if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id in function_names)
+    return graph
+
+
+# worker pools analyzing functions, shared by all the files of a run
+module_pools = {}
+# the module a worker analyzes functions of, with its CFG
+module_analysis = {}
+
+
+def close_pools():
+    for pool in module_pools.values():
+        pool.shutdown()
+    module_pools.clear()
+    Concolic.close_pools()
+
+
+def get_module_pool(function_jobs):
+    if function_jobs not in module_pools:
+        module_pools[function_jobs] = ProcessPoolExecutor(max_workers=function_jobs)
+    return module_pools[function_jobs]
+
+
+def analyze_worker(module, func_name):
+    # runs in a worker process, the results go back in their picklable form
+    # along with the stats of this function. The CFG of a module is built
+    # once per worker.
+    src_code, only, function_names, kwargs = module
+    if module_analysis.get('module') != module:
+        module_analysis.update(module=module, py_cfg=FrontEnd.from_source(src_code).cfg(only))
+    run_stats.clear()
+    run_timers.clear()
+    results = analyze(func_name, src_code, module_analysis['py_cfg'], function_names, **dict(kwargs))
+    return [{fn_name: [HelperFunc.dump_test_case(t) for t in test_cases]}
+            for result in results for fn_name, test_cases in result.items()], run_stats, run_timers
+
+
+def analyze_module(src_code, only, function_names, function_jobs, functions, **kwargs):
+    # every function is analyzed in a worker process, which analyzes the
+    # callees it needs itself. Yields (func_name, results) in the order of
+    # functions.
+    module = (src_code, frozenset(only), tuple(function_names), tuple(sorted(dict(kwargs, jobs=1).items())))
+    pool = get_module_pool(function_jobs)
+    futures = {}
+    try:
+        for func_name in functions:
+            futures[func_name] = pool.submit(analyze_worker, module, func_name)
+        for func_name in functions:
+            dumped, stats, timers = futures[func_name].result()
+            run_stats.update(stats)
+            run_timers.update(timers)
+            yield func_name, [{fn_name: [HelperFunc.load_test_case(t) for t in test_cases]
+                               for fn_name, test_cases in result.items()}
+                              for result in dumped]
+    except BrokenProcessPool:
+        # the next file gets a new pool
+        del module_pools[function_jobs]
+        raise
+    finally:
+        for future in futures.values():
+            future.cancel()
 
 
 def is_constant_assigned(constraint):
     for cons in constraint:
-        if ' == ' in cons:
-            if is_number(cons.split(' == ')[-1]):
-                return True
+        if constant_value(cons) is not None:
+            return True
     return False
 
 
 def assign_value_to_argument(call_function_with_constant, constraint):
     constraint_args = constraint[0]
-    if 'z3.And(' in constraint_args:
-        args = constraint_args.split('(')[1].split(')')[0].split(',')
+    if z3.is_and(constraint_args):
+        args = constraint_args.children()
         if len(args) != len(call_function_with_constant):
             return constraint
         for i, (x, y) in enumerate(zip(args, call_function_with_constant)):
-            if y != 'None':
-                new_var = x.split('==')[-1].strip()
+            if y is not None:
+                new_var = x.arg(1)
                 if is_constant_assigned(constraint):
                     continue
-                temp = new_var + ' == ' + str(y)
-                constraint.insert(1, temp)
+                constraint.insert(1, new_var == y)
     return constraint
 
 
-def call_sub_function(functions_with_constant, src_code, function_names, py_cfg):
-    results = []
+# results of callee analyses by (callee, constant arguments, source, options),
+# shared by all the call sites of a run and evicted least recently used first
+callee_cache = OrderedDict()
+
+
+def call_sub_function(functions_with_constant, src_code, function_names, py_cfg, **kwargs):
     for function_name_with_index in functions_with_constant:
         func_name = function_name_with_index.split('__')[0]
         arg_values = functions_with_constant[function_name_with_index]
         for i, func in enumerate(function_names):
             if func == func_name:
-                results += analyze(function_names[i], src_code, py_cfg, function_names,
-                                   call_function_with_constant=arg_values)
+                key = (func_name, tuple(arg_values), src_code, tuple(sorted(kwargs.items())))
+                yield from memoized_analysis(key, analyze_iter(function_names[i], src_code, py_cfg, function_names,
+                                                               call_function_with_constant=arg_values, **kwargs))
+
+
+def memoized_analysis(key, analysis):
+    if key in callee_cache:
+        run_stats['callee_cache_hits'] += 1
+        callee_cache.move_to_end(key)
+        yield from callee_cache[key]
+        return
+    results = []
+    for result in analysis:
+        results.append(result)
+        yield result
+    # only complete analyses are stored, and as with --reuse none with a path
+    # the solver gave up on or ran out of time for
+    if HelperFunc.CALLEE_CACHE_SIZE > 0 and not any(test_case is not None and 'unknown' in test_case
+                                                    for fn_name, test_case in results):
+        callee_cache[key] = results
+        while len(callee_cache) > HelperFunc.CALLEE_CACHE_SIZE:
+            callee_cache.popitem(last=False)
+
+
+def analyze(func_name, src_code, py_CFG, function_names, call_function_with_constant=[], sink=None, keep=True,
+            **kwargs):
+    # the results of the function and its callees, written to the sink as
+    # they are solved. Without keep they are only written, and None is
+    # returned.
+    results = [] if keep else None
+    for fn_name, test_case in analyze_iter(func_name, src_code, py_CFG, function_names,
+                                           call_function_with_constant, **kwargs):
+        if test_case is None:
+            if keep:
+                results.append({fn_name: []})
+            if sink is not None:
+                sink.begin(fn_name)
+        else:
+            if keep:
+                results[-1][fn_name].append(test_case)
+            if sink is not None:
+                sink.write(fn_name, test_case)
     return results
 
 
-def analyze(func_name, src_code, py_CFG, function_names, call_function_with_constant=[]):
-    advanced_fuzzer = AdvancedSymbolicFuzzer(func_name, src_code, py_CFG)
-    paths = advanced_fuzzer.get_all_paths(advanced_fuzzer.fnenter)
-    report = {}
-    report[func_name] = []
+def analyze_iter(func_name, src_code, py_CFG, function_names, call_function_with_constant=[], **kwargs):
+    # yields (func_name, None) when the analysis of a function starts and then
+    # (func_name, test_case) for every solved path, followed by the analyses of
+    # the called functions
+    # a concrete run would not take the constant arguments of a call
+    concolic = kwargs.get('concolic', False) and not call_function_with_constant
+    advanced_fuzzer = AdvancedSymbolicFuzzer(func_name, src_code, py_CFG, **dict(kwargs, concolic=concolic))
     functions_with_constant = {}
-    results = []
-    used_constraint = []
-    path_count = 0
-    for i in range(len(paths)):
-        constraint = advanced_fuzzer.extract_constraints(paths[i].get_path_to_root())
-        concat_constraint = '__'.join(constraint)
-        if concat_constraint in used_constraint or len(constraint) <= 1:
+    yield func_name, None
+
+    paths = path_constraints(advanced_fuzzer, function_names, call_function_with_constant, functions_with_constant)
+    for constraint, (test_case, is_unsat) in advanced_fuzzer.solve_constraints(paths):
+        test_case['constraint'] = constraint
+        if call_function_with_constant:
+            test_case['constant'] = call_function_with_constant
+        yield func_name, test_case
+    advanced_fuzzer.close()
+    run_stats.update(advanced_fuzzer.stats)
+    run_timers.update(advanced_fuzzer.timers)
+
+    yield from call_sub_function(functions_with_constant, src_code, function_names, py_CFG, **kwargs)
+
+
+def path_constraints(advanced_fuzzer, function_names, call_function_with_constant, functions_with_constant):
+    index = PathIndex()
+    for leaf in advanced_fuzzer.timed('explore', advanced_fuzzer.iter_paths(advanced_fuzzer.fnenter)):
+        path = leaf.get_path_to_root()
+        constraint = advanced_fuzzer.extract_constraints(path)
+        if len(constraint) <= 1:
+            continue
+        with advanced_fuzzer.timer('dedup'):
+            new = index.add(constraint)
+        if not new:
             continue
-        path_count += 1
-        used_constraint.append(concat_constraint)
         constraint, constant_for_sub_function = seperate_function_call_constraints(constraint, function_names)
         if call_function_with_constant:
             constraint = assign_value_to_argument(call_function_with_constant, constraint)
 
         functions_with_constant.update(constant_for_sub_function)
-        test_case, is_unsat = advanced_fuzzer.solve_constraint(constraint, paths[i].get_path_to_root())
-        test_case['constraint'] = constraint
-        if call_function_with_constant:
-            test_case['constant'] = call_function_with_constant
-        report[func_name].append(test_case)
-    results.append(report)
+        yield constraint, path
+    advanced_fuzzer.stats['duplicate_paths'] += index.duplicates
+    advanced_fuzzer.stats['collapsed_paths'] += index.collapsed
 
-    results += call_sub_function(functions_with_constant, src_code, function_names, py_CFG)
-    return results
 
-
-def is_number(string):
-    try:
-        float(string)
-        return True
-    except ValueError:
-        return False
+def function_calls(expression, function_names):
+    calls = []
+    if z3.is_app(expression) and expression.num_args() > 0 and \
+            expression.decl().kind() == z3.Z3_OP_UNINTERPRETED and expression.decl().name() in function_names:
+        calls.append(expression)
+    for child in expression.children():
+        calls.extend(function_calls(child, function_names))
+    return calls
 
 
 def seperate_function_call_constraints(constraints, function_names):
-    primary_constraints = constraints
-    index_of_function_call = []
-    function_with_args = {}
+    primary_constraints = []
     function_with_constant = {}
     for i, constraint in enumerate(constraints):
-        temp = constraint.split('(')
-        for j, function_call in enumerate(temp):
-            if function_call in function_names:
-                arguments = temp[j + 1]
-                arguments = arguments.replace(')', '').split(',')
-                function_name_with_index = function_call + '__' + str(i)
-                function_with_args[function_name_with_index] = arguments + [str(i)]
-                index_of_function_call.append(i)
-
-    for function_name_with_index in function_with_args:
-        function_with_constant[function_name_with_index] = []
-        arguments = function_with_args[function_name_with_index][:-1]
-        location = function_with_args[function_name_with_index][-1]
-        for variable in arguments:
-            variable = variable.strip()
-            constant = None
-            for i, constraint in enumerate(constraints):
-                if i > int(location):
-                    break
-                if variable in constraint and ' == ' in constraint and ',' not in constraint:
-                    value = constraint.split(' == ')[-1].strip()
-                    if is_number(value):
+        calls = function_calls(constraint, function_names)
+        if not calls:
+            primary_constraints.append(constraint)
+        for function_call in calls:
+            function_name_with_index = function_call.decl().name() + '__' + str(i)
+            function_with_constant[function_name_with_index] = []
+            for variable in function_call.children():
+                constant = None
+                for cons in constraints[:i + 1]:
+                    value = constant_value(cons, variable)
+                    if value is not None:
                         constant = value
-            if not constant:
-                function_with_constant[function_name_with_index].append('None')
-            else:
                 function_with_constant[function_name_with_index].append(constant)
 
     for function_name_with_index in function_with_constant.copy():
-        if all(v == 'None' for v in function_with_constant[function_name_with_index]):
+        if all(v is None for v in function_with_constant[function_name_with_index]):
             del function_with_constant[function_name_with_index]
 
-    for i in reversed(sorted(index_of_function_call)):
-        primary_constraints.pop(i)
     return primary_constraints, function_with_constant
 
 
+def report_filename(input, unique=False):
+    # reports/NAME_report.txt. In a batch NAME is the unique_name of the
+    # input, files of the same name in different directories get a report each.
+    name = HelperFunc.unique_name(input) if unique else os.path.basename(input)[:-3]
+    return os.path.join('reports', name + '_report.txt')
+
+
 def report(results, input):
-    if platform.system() == "Windows":
-        filename = input.split('\\')[-1]
-        filename = 'reports\\' + filename[:-3] + '_report.txt'
-    else:
-        filename = input.split('/')[-1]
-        filename = 'reports/' + filename[:-3] + '_report.txt'
-    with open(filename, 'w+') as f:
-        f.write('***************************************** ALL PATH CONSTRAINTS **********************************\n')
-        for result in results:
-            for fn_name in result:
-                if result[fn_name]:
-                    f.write(
-                        '***************************************** FUNC NAME: ' + fn_name + ' *************************************\n')
-                    i = 1
-                    for elements in result[fn_name]:
-                        if 'constraint' in elements:
-                            f.write('\t' + str(i) + ': ' + str(elements['constraint']) + '\n')
-                            i += 1
-                    f.write(
-                        '*************************************************************************************************\n\n')
-
-    with open(filename, 'a+') as f:
-        f.write('*************************************************************************************************\n')
-        f.write('********************* UNSATISFIED PATH *********************\n')
-        f.write('*************************************************************************************************\n\n')
-        for result in results:
-            for fn_name in result:
-                if result[fn_name]:
-                    f.write('\n****************** FUNCTION NAME: ' + fn_name + ' ******************\n')
-                    for elements in result[fn_name]:
-                        if 'unsat_core' in elements:
-                            f.write("\n******************##### UNSAT PATH FOUND #####******************\n")
-                            if 'constant' in elements:
-                                f.write('------ constraint values: \n')
-                                f.write('Variables: ' + ', '.join(elements['constant']) + '\n')
-                            break_point = 0
-                            f.write('------ constraint path: \n')
-                            for s in elements['constraint']:
-                                f.write('\t' + s + '\n')
-                            f.write('------ unsat core: \n')
-                            for s in elements['unsat_core']:
-                                f.write(s + '\n')
-                                break_point += 1
-                            count = 0
-                            f.write('------ statement: \n')
-                            for s in elements['statement']:
-                                if count >= break_point:
-                                    break
-                                count += 1
-                                f.write(s + '\n')
-                            f.write(
-                                '*************************************************************************************************\n\n')
-                    f.write('\n' + '#' * (len(fn_name) + 48) + '\n')
-
-    with open(filename, 'a+') as f:
-        f.write('*************************************************************************************************\n')
-        f.write('****************** SATISFIED PATH ******************\n')
-        f.write('*************************************************************************************************\n\n')
-        for result in results:
-            for fn_name in result:
-                if result[fn_name]:
-                    f.write('\n****************** FUNCTION NAME: ' + fn_name + ' ******************\n')
-                    for elements in result[fn_name]:
-                        if 'unsat_core' not in elements:
-                            for e_key in elements:
-                                if e_key == 'constraint':
-                                    f.write('****************** CONSTRAINT PATH ******************\n')
-                                    for s in elements['constraint']:
-                                        f.write(s + '\n')
-                                    f.write('******************************************************\n\n')
-                                else:
-                                    f.write(str(e_key) + ": " + str(elements[e_key]) + '\n')
-
-                    f.write('\n' + '#' * (len(fn_name) + 48) + '\n')
+    # the text report of results held in memory, through a record stream
+    fd, stream = tempfile.mkstemp(suffix='.jsonl')
+    os.close(fd)
+    try:
+        sink = ReportSink(stream)
+        sink.write_results(results)
+        sink.close()
+        render_text(stream, report_filename(input))
+    finally:
+        os.remove(stream)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Argument parser')
 
-    parser.add_argument("-i", "--input", help="input path", type=str, required=True)
+    parser.add_argument("-i", "--input", help="input files, directories or glob patterns, more than one file is "
+                                              "analyzed as a batch", type=str, nargs='+', required=True)
+    parser.add_argument("--summary", help="JSON summary of a batch: paths, sat and unsat counts, seconds and "
+                                          "failures per file", type=str, default='reports/batch_summary.json')
     parser.add_argument("-d", "--depth", help="max depth", type=int, required=True)
+    parser.add_argument("--incremental", help="solve paths sharing a prefix incrementally", action="store_true")
+    parser.add_argument("-j", "--jobs", help="solve the paths of a function in N worker processes, the results come "
+                        "in the order and with the statuses of 1", type=int, default=1)
+    parser.add_argument("--function-jobs", help="analyze the functions of the module in N worker processes",
+                        type=int, default=1)
+    parser.add_argument("--callee-cache-size", help="number of callee analyses kept for reuse, 0 disables",
+                        type=int, default=HelperFunc.CALLEE_CACHE_SIZE)
+    parser.add_argument("--cache", help="directory of the persistent solver cache", type=str)
+    parser.add_argument("--cache-size", help="maximum number of cached solutions", type=int,
+                        default=HelperFunc.CACHE_SIZE)
+    parser.add_argument("--clear-cache", help="empty the solver cache before the run", action="store_true")
+    parser.add_argument("--front-end-cache", help="directory keeping the parsed modules and CFGs of files between runs",
+                        type=str)
+    parser.add_argument("--reuse", help="directory keeping the results of unchanged functions between runs",
+                        type=str)
+    parser.add_argument("--prune", help="drop infeasible branches while exploring", choices=['branch', 'level', 'frontier'])
+    parser.add_argument("--prune-levels", help="check feasibility every N levels", type=int, default=HelperFunc.PRUNE_LEVELS)
+    parser.add_argument("--prune-frontier", help="check feasibility once the frontier exceeds N paths", type=int,
+                        default=HelperFunc.PRUNE_FRONTIER)
+    parser.add_argument("--prefix-cache-size", help="number of prefixes checked for pruning whose result is kept "
+                        "per function", type=int, default=HelperFunc.PREFIX_CACHE)
+    parser.add_argument("--solver-scope", help="keep the inputs of solved paths out of the later paths of the function, "
+                                               "or solve every path on its own", choices=['function', 'path'],
+                        default='function')
+    parser.add_argument("--solver-reset", help="reset the solver after N checks", type=int,
+                        default=HelperFunc.SOLVER_RESET)
+    parser.add_argument("--learn-cores", help="skip paths and subtrees containing the unsat core of a solved path",
+                        action="store_true")
+    parser.add_argument("--jsonl", help="write one JSON record per path to this file as soon as it is solved, "
+                                        "in a batch to FILE.jsonl in this directory",
+                        type=str)
+    parser.add_argument("--no-text-report", help="do not render the text report", action="store_true")
+    parser.add_argument("--model-cache", help="try the models of solved paths and the unsat cores found on a path before "
+                                              "solving it", action="store_true")
+    parser.add_argument("--model-cache-size", help="number of models and of unsat cores kept per function", type=int,
+                        default=HelperFunc.MODEL_CACHE)
+    parser.add_argument("--models-per-path", help="look for up to K inputs per satisfiable path, each away from the "
+                                                  "one before", type=int, default=HelperFunc.MODELS_PER_PATH,
+                        metavar='K')
+    parser.add_argument("--slice", help="solve the groups of predicates of a path that share no variable on their own",
+                        action="store_true")
+    parser.add_argument("--slice-cache-size", help="number of solved groups of predicates kept per function", type=int,
+                        default=HelperFunc.SLICE_CACHE)
+    parser.add_argument("--presolve", help="try random and boundary inputs on the paths of linear int comparisons "
+                                           "with numpy before solving them", action="store_true")
+    parser.add_argument("--presolve-samples", help="number of candidate inputs tried on a batch of paths", type=int,
+                        default=HelperFunc.PRESOLVE_SAMPLES)
+    parser.add_argument("--concolic", help="run the function on seed inputs and found models, paths a run takes are "
+                                           "not solved", action="store_true")
+    parser.add_argument("--seeds", help="JSON file of seed inputs, {FUNC: [{PARAM: VALUE}, ...]}", type=str)
+    parser.add_argument("--concolic-timeout", help="seconds a concrete run may take", type=float,
+                        default=HelperFunc.CONCOLIC_TIMEOUT)
+    parser.add_argument("--stats", help="write counters and seconds per phase as JSON to this file", type=str)
+    parser.add_argument("--check-timeout", help="milliseconds a solver check may take, the path is unknown after that",
+                        type=int)
+    parser.add_argument("--function-budget", help="seconds for the analysis of a function", type=float)
+    parser.add_argument("--time-limit", help="seconds for the whole run, the report has what was finished by then",
+                        type=float)
+    parser.add_argument("--search", help="order in which paths are explored", choices=['bfs', 'dfs', 'random', 'uncovered'],
+                        default='bfs')
+    parser.add_argument("--seed", help="seed of the random search", type=int, default=0)
+    parser.add_argument("--max-paths", help="stop exploring a function after N paths", type=int)
+    parser.add_argument("--loop-bound", help="times a loop is unrolled", type=int, default=HelperFunc.LOOP_BOUND)
+    parser.add_argument("--loop-bounds", help="unroll bounds of single loops as FUNC:LINE=N", nargs='+', default=[])
     args = parser.parse_args()
+    if args.presolve and PreSolver.numpy is None:
+        parser.error('--presolve needs numpy')
     main(args)
@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import subprocess
+from glob import glob
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES = sorted(glob(os.path.join(ROOT, 'Examples', '*.py')))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+
+def pytest_generate_tests(metafunc):
+    # a test taking example runs on every file of Examples
+    if 'example' in metafunc.fixturenames:
+        metafunc.parametrize('example', EXAMPLES, ids=os.path.basename)
+
+
+@pytest.fixture
+def example_path():
+    # the path of a file of Examples by its name
+    return lambda name: os.path.join(ROOT, 'Examples', name)
+
+
+@pytest.fixture
+def run_main():
+    # runs main.py with args from the root of the repository
+    def run_main(*args):
+        subprocess.run([sys.executable, os.path.join(ROOT, 'src', 'main.py')] + list(args), cwd=ROOT, check=True,
+                       capture_output=True)
+    return run_main
+
+
+@pytest.fixture
+def solve(tmp_path, run_main):
+    # the JSON lines main.py writes for the paths of a file, run with args
+    def solve(source, *args):
+        output = tmp_path / ('%d.jsonl' % len(list(tmp_path.iterdir())))
+        run_main('-i', source, '-d', '10', '--jsonl', str(output), '--no-text-report', *args)
+        return output.read_text().splitlines()
+    return solve
+
+
+@pytest.fixture
+def statuses(solve):
+    # (function, constraints, status) of every path of a file, run with args
+    def statuses(source, *args):
+        return [(record['function'], record['constraints'], record['status'])
+                for record in map(json.loads, solve(source, *args))]
+    return statuses
@@ -0,0 +1,27 @@
+import os
+import json
+import shutil
+
+import main
+
+
+def test_files_of_the_same_name_get_their_own_outputs(tmp_path, run_main, example_path):
+    for directory, example in [('x', 'simpleIfElse.py'), ('y', 'functionCall.py')]:
+        os.makedirs(tmp_path / 'batch' / directory)
+        shutil.copy(example_path(example), tmp_path / 'batch' / directory / 'm.py')
+    run_main('-i', str(tmp_path / 'batch'), '-d', '10', '--jsonl', str(tmp_path / 'records'), '--no-text-report',
+             '--summary', str(tmp_path / 'summary.json'))
+    with open(tmp_path / 'summary.json') as f:
+        summary = json.load(f)
+    assert len({entry['jsonl'] for entry in summary}) == 2
+    assert sorted(os.listdir(tmp_path / 'records')) == sorted(os.path.basename(entry['jsonl']) for entry in summary)
+    functions = []
+    for entry in summary:
+        with open(entry['jsonl']) as f:
+            functions.append({json.loads(line)['function'] for line in f})
+    assert functions[0] != functions[1]
+
+
+def test_report_names():
+    assert main.report_filename('a/m.py') == os.path.join('reports', 'm_report.txt')
+    assert main.report_filename('a/m.py', unique=True) != main.report_filename('b/m.py', unique=True)
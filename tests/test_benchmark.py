@@ -0,0 +1,33 @@
+import benchmark
+
+
+def result(seconds, peak, params=None):
+    return {'params': params or {'ifs': 4}, 'depth': 10, 'peak_memory': peak,
+            'phases': dict.fromkeys(benchmark.PHASES, seconds)}
+
+
+def test_margin_keeps_tiny_phases_from_failing():
+    assert benchmark.regressions({'ifs': result(0.012, 1000)}, {'ifs': result(0.004, 1000)}, 0.25) == []
+
+
+def test_slower_phases_and_larger_peaks_are_regressions():
+    slower = benchmark.regressions({'ifs': result(2.0, 200000)}, {'ifs': result(1.0, 100000)}, 0.25)
+    assert {phase for name, phase, before, now in slower} == set(benchmark.PHASES) | {'peak_memory'}
+
+
+def test_cases_run_with_other_parameters_are_not_compared():
+    assert benchmark.regressions({'ifs': result(2.0, 200000, {'ifs': 8})}, {'ifs': result(1.0, 100000)}, 0.25) == []
+
+
+def test_sizes_and_scale():
+    assert benchmark.case_params('lists', {'size': 8}, 1.0) == dict(ifs=2, size=8)
+    assert benchmark.case_params('loops', {}, 2.0) == dict(ifs=0, loops=1, bound=4)
+
+
+def test_chain_length_and_loop_bound_are_separate_sizes():
+    assert benchmark.case_params('calls', {'chain': 5}, 1.0) == dict(ifs=1, chain=5)
+    assert benchmark.case_params('mixed', {'bound': 7}, 1.0)['chain'] == 2
+    source = benchmark.generate(ifs=1, chain=4)
+    assert [line for line in source.splitlines() if line.startswith('def ')] == \
+        ['def f%d(a: int, b: int):' % f for f in range(1, 5)]
+    assert all('f%d(c, b)' % (f + 1) in source for f in range(1, 4)) and 'f5(' not in source
@@ -0,0 +1,6 @@
+def test_cache_does_not_change_results(solve, tmp_path_factory, example):
+    cache = str(tmp_path_factory.mktemp('cache'))
+    uncached = solve(example)
+    # cold, then warm
+    assert solve(example, '--cache', cache) == uncached
+    assert solve(example, '--cache', cache) == uncached
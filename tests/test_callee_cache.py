@@ -0,0 +1,10 @@
+import main
+
+
+def test_analyses_with_unknown_paths_are_not_memoized():
+    main.callee_cache.clear()
+    complete = [('f', None), ('f', {'x': None})]
+    cut_short = [('g', None), ('g', {'unknown': 'timeout'})]
+    assert list(main.memoized_analysis('f', iter(complete))) == complete
+    assert list(main.memoized_analysis('g', iter(cut_short))) == cut_short
+    assert list(main.callee_cache) == ['f']
@@ -0,0 +1,6 @@
+def test_concolic_keeps_statuses(statuses, example):
+    assert statuses(example, '--concolic') == statuses(example)
+
+
+def test_concolic_with_workers_keeps_statuses(statuses, example):
+    assert statuses(example, '--concolic', '-j', '2') == statuses(example)
@@ -0,0 +1,30 @@
+import ast
+
+import main
+from HelperFunc import module_declarations
+
+SOURCE = '''
+def f(a: int):
+    if a > 0:
+        return 1
+    return 0
+
+def g(b: int):
+    return b
+'''
+
+
+def fingerprints(src_code):
+    astree = ast.parse(src_code)
+    graph = main.call_graph(astree, ['f', 'g'])
+    return main.function_fingerprints(astree, graph, module_declarations(src_code), {'depth': 10})
+
+
+def test_fingerprint_covers_declarations_of_other_functions():
+    # f's arguments come from the table of the whole module
+    changed = SOURCE.replace('def g(b: int)', 'def g(b: int, c: int)')
+    assert fingerprints(SOURCE)['f'] != fingerprints(changed)['f']
+
+
+def test_fingerprint_is_stable():
+    assert fingerprints(SOURCE) == fingerprints(SOURCE)
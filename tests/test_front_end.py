@@ -0,0 +1,45 @@
+import pytest
+
+import FrontEnd
+import HelperFunc
+
+
+@pytest.fixture
+def load(example_path):
+    # the front end of an example, read through the pickles in directory
+    def load(directory):
+        FrontEnd.front_ends.clear()
+        front_end = FrontEnd.load(example_path('simpleIfElse.py'), str(directory))
+        front_end.cfg()
+        return front_end
+    return load
+
+
+def test_front_end_is_read_back(tmp_path, load):
+    assert load(tmp_path).origin == 'parsed'
+    assert load(tmp_path).origin == 'disk'
+
+
+def test_unreadable_pickle_is_parsed_again(tmp_path, load):
+    load(tmp_path)
+    path, = tmp_path.iterdir()
+    path.write_bytes(path.read_bytes()[:100])
+    assert load(tmp_path).origin == 'parsed'
+    assert load(tmp_path).origin == 'disk'
+
+
+def test_pickles_of_another_schema_are_not_read(tmp_path, monkeypatch, load):
+    load(tmp_path)
+    monkeypatch.setattr(FrontEnd, 'SCHEMA', FrontEnd.SCHEMA + 1)
+    assert load(tmp_path).origin == 'parsed'
+
+
+def test_tables_of_saved_front_ends_are_evicted(tmp_path, monkeypatch, load):
+    load(tmp_path)
+    HelperFunc.declaration_tables.clear()
+    monkeypatch.setattr(HelperFunc, 'FRONT_ENDS', 1)
+    front_end = load(tmp_path)
+    assert front_end.origin == 'disk'
+    assert HelperFunc.declaration_tables[front_end.src_code] is front_end.declarations
+    HelperFunc.module_declarations('x: int = 0\n')
+    assert list(HelperFunc.declaration_tables) == ['x: int = 0\n']
@@ -0,0 +1,73 @@
+import pytest
+
+import FrontEnd
+from advancedfuzzer import AdvancedSymbolicFuzzer
+from Frontier import make_frontier, RandomRestart
+
+SOURCE = '''
+def f(a: int, b: int):
+    if a > 0:
+        if b > 0:
+            return 1
+        return 2
+    while b < a:
+        b = b + 1
+    return 0
+'''
+
+
+def drain(frontier, children):
+    # pops every node, pushing the children it has in the tree
+    frontier.push(children[None])
+    order = []
+    while frontier:
+        node = frontier.pop()
+        order.append(node)
+        frontier.push(children.get(node, []))
+    return order
+
+
+TREE = {None: [1, 2], 1: [3, 4], 2: [5]}
+
+
+def test_breadth_and_depth_first_order():
+    assert drain(make_frontier('bfs'), TREE) == [1, 2, 3, 4, 5]
+    assert drain(make_frontier('dfs'), TREE) == [1, 3, 4, 2, 5]
+
+
+def test_random_restarts_depend_on_the_seed_only():
+    orders = [drain(RandomRestart(seed, restart=2), TREE) for seed in [1, 1, 2, 3]]
+    assert orders[0] == orders[1]
+    assert all(sorted(order) == [1, 2, 3, 4, 5] for order in orders)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        make_frontier('best')
+
+
+def paths(search, **options):
+    front_end = FrontEnd.from_source(SOURCE)
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), search=search, loop_bound=2, **options)
+    found = [tuple(node.cfgnode.rid for node in leaf.get_path_to_root()) for leaf in fuzzer.iter_paths(fuzzer.fnenter)]
+    fuzzer.close()
+    return found, fuzzer.stats
+
+
+@pytest.mark.parametrize('search', ['dfs', 'random', 'uncovered'])
+def test_strategies_find_the_same_paths(search):
+    found, stats = paths(search)
+    assert sorted(found) == sorted(paths('bfs')[0])
+    assert len(set(found)) == len(found) == stats['paths']
+
+
+@pytest.mark.parametrize('search', ['bfs', 'dfs', 'random', 'uncovered'])
+def test_max_paths_stops_the_exploration(search):
+    found, stats = paths(search, max_paths=2)
+    assert len(found) == 2 and stats['stopped_explorations'] == 1
+
+
+@pytest.mark.parametrize('search', ['dfs', 'random', 'uncovered'])
+def test_strategies_keep_the_statuses_of_paths_solved_alone(statuses, example, search):
+    assert sorted(statuses(example, '--search', search, '--solver-scope', 'path')) == \
+        sorted(statuses(example, '--solver-scope', 'path'))
@@ -0,0 +1,32 @@
+import z3
+import pytest
+
+import FrontEnd
+from advancedfuzzer import AdvancedSymbolicFuzzer
+
+
+@pytest.mark.parametrize('args', [[], ['--presolve'], ['--solver-scope', 'path']], ids=' '.join)
+def test_incremental_keeps_statuses(statuses, example, args):
+    assert statuses(example, '--incremental', *args) == statuses(example, *args)
+
+
+def test_unsat_prefix_is_not_checked_again():
+    front_end = FrontEnd.from_source('def f(a: int, b: int):\n    return a\n')
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), incremental=True)
+    a, b = z3.Ints('a b')
+    paths = [([a > 0, a < 0, b > 0], []), ([a > 0, a < 0, b < 0], []), ([a > 0, b > 0], [])]
+    results = [is_unsat for constraints, (test_case, is_unsat) in fuzzer.solve_each(iter(paths))]
+    assert results == [True, True, False]
+    assert fuzzer.stats['solver_checks'] == 2 and fuzzer.stats['avoided_checks'] == 1
+    fuzzer.close()
+
+
+def test_blocking_clauses_outlive_their_frames():
+    front_end = FrontEnd.from_source('def f(a: int, b: int):\n    return a\n')
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), incremental=True)
+    a, b = z3.Ints('a b')
+    paths = [([a == 1], []), ([b > 0], []), ([a == 1], [])]
+    results = [is_unsat for constraints, (test_case, is_unsat) in fuzzer.solve_each(iter(paths))]
+    # the only input of the last path is that of the first
+    assert results == [False, False, True]
+    fuzzer.close()
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.mark.parametrize('scope', ['function', 'path'])
+def test_jobs_do_not_change_statuses(statuses, example, scope):
+    assert statuses(example, '-j', '1', '--solver-scope', scope) == \
+        statuses(example, '-j', '4', '--solver-scope', scope)
+
+
+def test_worker_results_do_not_depend_on_the_number_of_workers(solve, example):
+    assert solve(example, '-j', '2') == solve(example, '-j', '4')
@@ -0,0 +1,37 @@
+import pytest
+
+from advancedfuzzer import AdvancedSymbolicFuzzer
+import FrontEnd
+
+SOURCE = '''
+def f(a: int, b: int):
+    if a > 0:
+        if b > a:
+            if b < 0:
+                return 1
+            return 2
+        return 3
+    if b > 0:
+        if a > b:
+            return 4
+    return 0
+'''
+
+
+@pytest.mark.parametrize('args', [['--learn-cores'], ['--learn-cores', '--incremental']])
+def test_learned_cores_keep_statuses(statuses, example, args):
+    assert statuses(example, *args) == statuses(example)
+
+
+def test_pruned_prefixes_are_bounded():
+    front_end = FrontEnd.from_source(SOURCE)
+    leaves = {}
+    for size in [1, 100]:
+        fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), prune='branch',
+                                        prefix_cache_size=size)
+        leaves[size] = [leaf.get_path_to_root()[-1].cfgnode.rid for leaf in fuzzer.iter_paths(fuzzer.fnenter)]
+        assert 0 < len(fuzzer.feasible_prefixes) <= size
+        assert fuzzer.stats['pruned_paths'] > 0
+        fuzzer.close()
+    # the bound does not change which paths are pruned
+    assert leaves[1] == leaves[100]
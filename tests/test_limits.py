@@ -0,0 +1,55 @@
+import json
+import time
+
+import z3
+
+import FrontEnd
+from advancedfuzzer import AdvancedSymbolicFuzzer
+from ReportSink import render_text
+
+# no solution, and nonlinear, z3 keeps searching
+FERMAT = '''
+def f(x: int, y: int, z: int):
+    if x > 0 and y > 0 and z > 0 and x * x * x + y * y * y == z * z * z:
+        return 1
+    return 0
+'''
+
+
+def fuzzer_of(**options):
+    front_end = FrontEnd.from_source(FERMAT)
+    return AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), **options)
+
+
+def test_nothing_is_explored_or_checked_past_the_deadline():
+    fuzzer = fuzzer_of(deadline=time.time() - 1)
+    assert not list(fuzzer.iter_paths(fuzzer.fnenter))
+    assert fuzzer.stats['stopped_explorations'] == 1
+    x = z3.Int('x')
+    [(constraints, (test_case, is_unsat))] = fuzzer.solve_each(iter([([x > 0], [])]))
+    assert test_case['unknown'] == 'time budget' and not is_unsat
+    assert fuzzer.stats['skipped_checks'] == 1 and not fuzzer.stats['solver_checks']
+    fuzzer.close()
+
+
+def test_check_timeout_makes_the_path_unknown(statuses, tmp_path):
+    source = tmp_path / 'fermat.py'
+    source.write_text(FERMAT)
+    found = statuses(str(source), '--check-timeout', '100')
+    assert [status for _, _, status in found] == ['unknown', 'sat']
+
+
+def test_unknown_paths_are_reported(solve, tmp_path):
+    source = tmp_path / 'fermat.py'
+    source.write_text(FERMAT)
+    records = [json.loads(line) for line in solve(str(source), '--check-timeout', '100')]
+    assert records[0]['reason'] and records[0]['lines']
+    stream, report = tmp_path / 'records.jsonl', tmp_path / 'report.txt'
+    stream.write_text('\n'.join(map(json.dumps, records)) + '\n')
+    render_text(str(stream), str(report))
+    assert 'UNKNOWN PATH' in report.read_text()
+
+
+def test_limits_that_are_not_reached_keep_the_results(solve, example):
+    assert solve(example, '--check-timeout', '60000', '--function-budget', '600', '--time-limit', '600') == \
+        solve(example)
@@ -0,0 +1,56 @@
+import pytest
+
+import FrontEnd
+import main
+from advancedfuzzer import AdvancedSymbolicFuzzer
+from HelperFunc import loop_heads
+
+SOURCE = '''
+def f(a: int, b: int):
+    i: int = 0
+    while i < a:
+        i = i + 1
+    j: int = 0
+    while j < b:
+        j = j + 1
+    return i + j
+'''
+
+
+def explored(**options):
+    front_end = FrontEnd.from_source(SOURCE)
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), **options)
+    paths = list(fuzzer.iter_paths(fuzzer.fnenter))
+    fuzzer.close()
+    return fuzzer, paths
+
+
+def test_loop_heads():
+    fuzzer, _ = explored()
+    assert sorted(head.lineno() for head in loop_heads(fuzzer.fnenter)) == [3, 6]
+
+
+@pytest.mark.parametrize('bound', [0, 1, 2, 3])
+def test_every_loop_is_entered_up_to_its_bound(bound):
+    fuzzer, paths = explored(loop_bound=bound)
+    # 0 to bound iterations of each of the two loops
+    assert len(paths) == (bound + 1) ** 2 and fuzzer.stats['loops'] == 2
+    assert all(fuzzer.extract_constraints(leaf.get_path_to_root()) for leaf in paths)
+
+
+def test_bound_of_a_single_loop():
+    assert len(explored(loop_bound=2, loop_bounds=main.loop_bounds(['f:3=0']))[1]) == 3
+    assert len(explored(loop_bound=2, loop_bounds=main.loop_bounds(['f:6=1']))[1]) == 6
+    # of another function
+    assert len(explored(loop_bound=2, loop_bounds=main.loop_bounds(['g:3=0']))[1]) == 9
+
+
+def test_loop_bounds_option():
+    assert main.loop_bounds(['f:3=0', 'a:b:7=2', 'f:3=1']) == ((('a:b', 7), 2), (('f', 3), 1))
+
+
+def test_unrolled_paths_are_sat(statuses, tmp_path):
+    source = tmp_path / 'loops.py'
+    source.write_text(SOURCE)
+    found = statuses(str(source), '--loop-bound', '2', '--solver-scope', 'path')
+    assert len(found) == 9 and {status for _, _, status in found} == {'sat'}
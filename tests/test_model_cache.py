@@ -0,0 +1,38 @@
+import pytest
+import z3
+
+import FrontEnd
+import main
+
+
+@pytest.mark.parametrize('args', [[], ['--incremental']])
+def test_model_cache_keeps_statuses(statuses, example, args):
+    assert statuses(example, '--model-cache', *args) == statuses(example, *args)
+
+
+def sat_inputs(example, **options):
+    # (constraints, input) of the sat paths of every function of a file
+    front_end = FrontEnd.load(example)
+    inputs = []
+    for func_name in dict.fromkeys(front_end.function_names):
+        for result in main.analyze(func_name, front_end.src_code, front_end.cfg(), front_end.function_names,
+                                   **options):
+            for test_cases in result.values():
+                inputs += [(test_case['constraint'], {x: y for x, y in test_case.items() if z3.is_expr(y)})
+                           for test_case in test_cases
+                           if 'unsat_core' not in test_case and 'unknown' not in test_case]
+    return inputs
+
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_cached_inputs_take_their_paths(example, incremental):
+    # a remembered model is one input of the path among others, so the values
+    # may differ from those of the solver
+    cached = sat_inputs(example, model_cache=True, incremental=incremental)
+    assert [list(map(str, c)) for c, _ in cached] == \
+        [list(map(str, c)) for c, _ in sat_inputs(example, incremental=incremental)]
+    for constraints, arguments in cached:
+        solver = z3.Solver()
+        solver.add(*constraints)
+        solver.add(*[z3.Const(x, y.sort()) == y for x, y in arguments.items()])
+        assert solver.check() == z3.sat
@@ -0,0 +1,15 @@
+import json
+
+
+def test_models_per_path(solve, example_path):
+    records = [json.loads(line) for line in solve(example_path('simpleIfElse.py'), '--models-per-path', '3')]
+    sat = [record for record in records if record['status'] == 'sat']
+    assert sat and all(len(record['models']) <= 2 for record in sat)
+    inputs = [tuple(map(tuple, model)) for record in sat for model in [record['model']] + record['models']]
+    # every input is blocked for the rest of the function
+    assert len(inputs) > len(sat) and len(set(inputs)) == len(inputs)
+
+
+def test_one_model_per_path_by_default(solve, example_path):
+    records = [json.loads(line) for line in solve(example_path('simpleIfElse.py'))]
+    assert not any('models' in record for record in records)
@@ -0,0 +1,64 @@
+import z3
+import pytest
+
+from PathIndex import PathIndex
+
+a, b = z3.Ints('a b')
+x0, x1, y0, y1 = z3.Ints('_x_0 _x_1 _y_0 _y_1')
+
+
+def collapses(first, second):
+    index = PathIndex()
+    assert index.add(first)
+    return not index.add(second)
+
+
+def test_exact_duplicate():
+    index = PathIndex()
+    assert index.add([a > b])
+    assert not index.add([a > b])
+    assert index.duplicates == 1 and index.collapsed == 0
+
+
+@pytest.mark.parametrize('first, second', [
+    ([a > b], [b < a]),
+    ([a >= b], [b <= a]),
+    ([a + b > 0], [b + a > 0]),
+    ([a > 0, b > 0], [b > 0, a > 0]),
+    ([a > 0, z3.BoolVal(True)], [a > 0]),
+    ([a > 0, a > 0], [a > 0]),
+    ([x0 == a + 1, x0 > 2], [x1 == a + 1, x1 > 2]),
+    ([x0 == a, y0 == b, x0 > y0], [y1 == a, x1 == b, y1 > x1]),
+])
+def test_equivalent_paths_collapse(first, second):
+    assert collapses(first, second)
+
+
+@pytest.mark.parametrize('first, second', [
+    ([a > b], [b > a]),
+    ([a < b], [a <= b]),
+    ([a > 0], [b > 0]),
+    ([a > 0], [a > 1]),
+    ([a - b > 0], [b - a > 0]),
+    ([a > 0], [z3.Not(a > 0)]),
+    ([a > 0, b > 0], [a > 0]),
+    ([x0 == a, y0 == b, x0 > y0], [x0 == a, y0 == b, y0 > x0]),
+    ([x0 == a, y0 == a, x0 > 0], [x0 == a, y0 == a, x0 > 0, y0 > 0]),
+    ([x0 > 0, y0 < 0], [x0 > 0, x0 < 0]),
+    ([x0 == a, y0 == b, x0 > 0], [x0 == b, y0 == a, x0 > 0]),
+])
+def test_different_paths_do_not_merge(first, second):
+    assert not collapses(first, second)
+
+
+def test_forms_are_computed_once_per_constraint(monkeypatch):
+    index = PathIndex()
+    calls = []
+    template = index.template
+    monkeypatch.setattr(index, 'template', lambda e, ssa: (z3.is_bool(e) and calls.append(e)) or template(e, ssa))
+    assert index.add([x0 == a, x0 > 0, b > 0])
+    assert index.add([x0 == a, x0 > 0, b < 0])
+    assert index.add([x0 == a, b < 0])
+    # the prefix shared with the path before is not looked at again
+    assert len(calls) == 4 and [c for c, _, _ in index.stack] == [(x0 == a).get_id(), (b < 0).get_id()]
+    assert not index.add([x1 == a, x1 > 0, b > 0])
@@ -0,0 +1,126 @@
+import random
+
+import pytest
+import z3
+
+import PreSolver
+import FrontEnd
+from advancedfuzzer import AdvancedSymbolicFuzzer
+from PreSolver import linear_atoms, eliminate, holds, assignment, LT, LE, EQ, NE
+
+a, b, c = z3.Ints('a b c')
+KEEP = {'a', 'b', 'c'}
+
+
+@pytest.mark.parametrize('e, atoms', [
+    (a + 2 * b < 3, [({'a': 1, 'b': 2}, -3, LT)]),
+    (a > b, [({'b': 1, 'a': -1}, 0, LT)]),
+    (a >= b, [({'b': 1, 'a': -1}, 0, LE)]),
+    (a - 3 * c == 4, [({'a': 1, 'c': -3}, -4, EQ)]),
+    (z3.Not(a < b), [({'a': -1, 'b': 1}, 0, LE)]),
+    (z3.Not(a <= 3), [({'a': -1}, 3, LT)]),
+    (z3.Not(a > b), [({'b': -1, 'a': 1}, 0, LE)]),
+    (z3.Not(a == b), [({'a': 1, 'b': -1}, 0, NE)]),
+    (z3.And(a < 1, z3.BoolVal(True), b != 2), [({'a': 1}, -1, LT), ({'b': 1}, -2, NE)]),
+])
+def test_linear_atoms(e, atoms):
+    assert linear_atoms(e) == atoms
+
+
+@pytest.mark.parametrize('e', [
+    a * b < 3,
+    z3.Real('r') < 1,
+    z3.Or(a < 1, b < 1),
+    a < 2 ** 30,
+])
+def test_not_linear(e):
+    assert linear_atoms(e) is None
+
+
+def random_term(rng, variables):
+    t = z3.IntVal(rng.randint(-20, 20))
+    for v in rng.sample(variables, rng.randint(1, min(3, len(variables)))):
+        t = t + rng.choice([-3, -2, -1, 1, 2, 3]) * v
+    return t
+
+
+def random_comparison(rng, variables):
+    left, right = random_term(rng, variables), random_term(rng, variables)
+    p = rng.choice([left < right, left <= right, left > right, left >= right, left == right, left != right])
+    return z3.Not(p) if rng.random() < 0.3 else p
+
+
+def evaluates_true(e, values):
+    pairs = [(z3.Int(name), z3.IntVal(value)) for name, value in values.items()]
+    return z3.is_true(z3.simplify(z3.substitute(e, *pairs)))
+
+
+def test_atoms_hold_as_z3_evaluates():
+    rng = random.Random(1)
+    for _ in range(300):
+        e = random_comparison(rng, [a, b, c])
+        values = {name: rng.randint(-10, 10) for name in KEEP}
+        assert holds(linear_atoms(e), values) == evaluates_true(e, values)
+
+
+def random_system(rng):
+    # SSA variables defined from the arguments and earlier ones, as paths
+    # with assignments have them, then comparisons over all of them
+    variables = [a, b, c]
+    expressions = []
+    for i in range(rng.randint(0, 4)):
+        x = z3.Int('_x_%d' % i)
+        expressions.append(x == random_term(rng, variables))
+        variables.append(x)
+    expressions += [random_comparison(rng, variables) for _ in range(rng.randint(1, 4))]
+    return expressions
+
+
+def test_eliminate_and_assignment_satisfy_z3():
+    numpy = pytest.importorskip('numpy')
+    rng = random.Random(2)
+    solved = 0
+    for seed in range(200):
+        expressions = random_system(rng)
+        atoms = linear_atoms(z3.And(*expressions))
+        definitions, left = eliminate(atoms, KEEP)
+        assert not any(name in definitions for coefficients, _, _ in left for name in coefficients)
+        names, candidates, satisfied = PreSolver.search([left], 256, seed)
+        solver = z3.Solver()
+        solver.add(*expressions)
+        if solver.check() == z3.unsat:
+            assert not satisfied.any()
+            continue
+        for row in numpy.nonzero(satisfied[:, 0])[0][:PreSolver.TRIES]:
+            values = assignment(names, candidates[row], definitions, left)
+            assert holds(left, values) and holds(atoms, values)
+            assert all(evaluates_true(e, values) for e in expressions)
+            solved += 1
+    assert solved
+
+
+def test_definitions_are_in_kept_variables():
+    x0, x1 = z3.Ints('_x_0 _x_1')
+    atoms = linear_atoms(z3.And(x0 == a + 2 * b, x1 == x0 - c, x1 > 3))
+    definitions, left = eliminate(atoms, KEEP)
+    assert definitions == {'_x_0': ({'a': 1, 'b': 2}, 0), '_x_1': ({'a': 1, 'b': 2, 'c': -1}, 0)}
+    assert left == [({'a': -1, 'b': -2, 'c': 1}, 3, LT)]
+
+
+def test_blocked_inputs():
+    front_end = FrontEnd.from_source('def f(a: int, b: int):\n    return a\n')
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), max_blocking=2)
+    fuzzer.block_model({'a': z3.IntVal(1), 'b': z3.IntVal(2)})
+    fuzzer.block_model({'a': z3.IntVal(3), 'b': None})
+    assert fuzzer.blocked({'a': z3.IntVal(1), 'b': z3.IntVal(2)})
+    assert not fuzzer.blocked({'a': z3.IntVal(1), 'b': z3.IntVal(3)})
+    # whatever b is
+    assert fuzzer.blocked({'a': z3.IntVal(3), 'b': z3.IntVal(5)})
+    assert not fuzzer.blocked({'a': None, 'b': z3.IntVal(2)})
+    # the oldest input is no longer blocked with its clause dropped
+    fuzzer.block_model({'a': z3.IntVal(4), 'b': z3.IntVal(4)})
+    assert not fuzzer.blocked({'a': z3.IntVal(1), 'b': z3.IntVal(2)})
+    assert fuzzer.blocked({'a': z3.IntVal(3), 'b': z3.IntVal(2)})
+    assert fuzzer.blocked({'a': z3.IntVal(4), 'b': z3.IntVal(4)})
+    assert sum(sum(inputs.values()) for inputs in fuzzer.blocked_index.values()) == 2
+    fuzzer.close()
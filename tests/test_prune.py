@@ -0,0 +1,47 @@
+import pytest
+
+from advancedfuzzer import AdvancedSymbolicFuzzer
+import FrontEnd
+
+SOURCE = '''
+def f(a: int):
+    if a > 0:
+        if a < 0:
+            if a == 3:
+                return 1
+            return 2
+        return 3
+    return 0
+'''
+
+
+@pytest.mark.parametrize('args', [
+    ['--prune', 'branch'],
+    ['--prune', 'level', '--prune-levels', '1'],
+    ['--prune', 'frontier', '--prune-frontier', '0'],
+    ['--learn-cores', '--prune', 'branch'],
+], ids=' '.join)
+def test_pruning_drops_only_unsat_paths(statuses, example, args):
+    pruned = statuses(example, *args)
+    rest = iter(pruned)
+    kept = next(rest, None)
+    for path in statuses(example):
+        if path == kept:
+            kept = next(rest, None)
+        else:
+            assert path[2] == 'unsat'
+    assert kept is None
+
+
+@pytest.mark.parametrize('prune', [None, 'branch', 'level', 'frontier'])
+def test_infeasible_subtree_is_not_explored(prune):
+    front_end = FrontEnd.from_source(SOURCE)
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), prune=prune, prune_levels=1,
+                                    prune_frontier=0)
+    lines = sorted(leaf.get_path_to_root()[-2].cfgnode.lineno() for leaf in fuzzer.iter_paths(fuzzer.fnenter))
+    if prune is None:
+        assert lines == [5, 6, 7, 8] and not fuzzer.stats['feasibility_checks']
+    else:
+        # nothing below a < 0 is feasible
+        assert lines == [7, 8] and fuzzer.stats['pruned_paths']
+    fuzzer.close()
@@ -0,0 +1,36 @@
+import json
+
+import z3
+
+import FrontEnd
+import main
+from ReportSink import ReportSink, read_records
+
+
+def test_every_record_has_its_lines(solve, example_path):
+    records = [json.loads(line) for line in solve(example_path('simpleIfElse.py'))]
+    assert {record['status'] for record in records} == {'sat', 'unsat'}
+    assert all(record['lines'] for record in records)
+
+
+def test_analyze_streams_without_keeping_results(tmp_path, example_path):
+    front_end = FrontEnd.load(example_path('simpleIfElse.py'))
+    sink = ReportSink(str(tmp_path / 'records.jsonl'))
+    results = main.analyze('test', front_end.src_code, front_end.cfg(), front_end.function_names, sink=sink,
+                           keep=False)
+    sink.close()
+    assert results is None and sum(sink.counts.values()) > 0
+
+
+def test_constraints_are_printed_once_per_analysis(tmp_path):
+    a = z3.Int('a')
+    sink = ReportSink(str(tmp_path / 'records.jsonl'))
+    sink.begin('f')
+    for c in [a < 0, a < 1]:
+        sink.write('f', {'constraint': [a > 0, c], 'unsat_core': [a > 0, c], 'statement': []})
+    assert len(sink.printed) == 3
+    sink.begin('g')
+    assert not sink.printed
+    sink.close()
+    records = list(read_records(str(tmp_path / 'records.jsonl')))
+    assert [record['constraints'] for record in records] == [['a > 0', 'a < 0'], ['a > 0', 'a < 1']]
@@ -0,0 +1,47 @@
+import pytest
+import z3
+
+from advancedfuzzer import AdvancedSymbolicFuzzer
+import FrontEnd
+
+# predicates over variables that are linked only through other predicates
+SOURCE = '''
+def f(a: int, b: int, c: int, d: int):
+    if a > b:
+        if c > d:
+            if b > c:
+                if d > a:
+                    return 1
+                return 2
+            return 3
+        if a + c > 10:
+            return 4
+    if d < 0:
+        if c == d:
+            return 5
+    return 0
+'''
+
+
+@pytest.mark.parametrize('scope', ['function', 'path'])
+def test_slicing_keeps_statuses(statuses, example, scope):
+    assert statuses(example, '--slice', '--solver-scope', scope) == statuses(example, '--solver-scope', scope)
+
+
+def test_slicing_keeps_statuses_of_linked_predicates(statuses, tmp_path_factory):
+    source = tmp_path_factory.mktemp('source') / 'linked.py'
+    source.write_text(SOURCE)
+    sliced = statuses(str(source), '--slice')
+    assert sliced == statuses(str(source))
+    assert {status for _, _, status in sliced} == {'sat', 'unsat'}
+
+
+def test_independent_groups():
+    front_end = FrontEnd.from_source(SOURCE)
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), slice=True)
+    a, b, c, d = z3.Ints('a b c d')
+    groups = fuzzer.independent([a > b, c > d, b > 0, d < 0])
+    assert sorted(groups) == [[0, 2], [1, 3]]
+    # linked through the last predicate
+    assert len(fuzzer.independent([a > b, c > d, b > c])) == 1
+    fuzzer.close()
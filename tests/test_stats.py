@@ -0,0 +1,50 @@
+import json
+import time
+from collections import Counter
+
+import FrontEnd
+from advancedfuzzer import AdvancedSymbolicFuzzer
+
+SOURCE = '''
+def f(a: int, b: int):
+    if a > b:
+        if b > a:
+            return 1
+        return 2
+    return 0
+'''
+
+
+def test_hooks_see_every_path_result_and_phase():
+    front_end = FrontEnd.from_source(SOURCE)
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg())
+    seen = Counter()
+    phases = Counter()
+    closed = []
+    fuzzer.add_hook('path', lambda path: seen.update(['path']))
+    fuzzer.add_hook('result', lambda constraints, result: seen.update(['unsat' if result[1] else 'sat']))
+    fuzzer.add_hook('phase', lambda phase, seconds: phases.update({phase: seconds}))
+    fuzzer.add_hook('close', lambda stats, timers: closed.append((dict(stats), dict(timers))))
+    start = time.perf_counter()
+    paths = ((fuzzer.extract_constraints(leaf.get_path_to_root()), leaf.get_path_to_root())
+             for leaf in fuzzer.timed('explore', fuzzer.iter_paths(fuzzer.fnenter)))
+    list(fuzzer.solve_constraints((constraints, path) for constraints, path in paths if constraints))
+    wall = time.perf_counter() - start
+    fuzzer.close()
+    assert seen == {'path': 3, 'sat': 2, 'unsat': 1}
+    stats, timers = closed[0]
+    assert stats['paths'] == 3 and stats['sat_checks'] == 2 and stats['unsat_checks'] == 1
+    assert {'explore', 'ssa', 'solve', 'z3'} <= set(timers)
+    # a phase does not count the phases inside it
+    assert timers == phases and sum(timers.values()) <= wall
+
+
+def test_stats_file_counts_the_paths(solve, example, tmp_path):
+    stats = tmp_path / 'stats.json'
+    records = solve(example, '--stats', str(stats))
+    assert records == solve(example)
+    stats = json.loads(stats.read_text())
+    assert stats['counters']['paths'] >= len(records)
+    assert sum(stats['counters'].get('%s_checks' % status, 0) for status in ['sat', 'unsat', 'unknown']) == \
+        stats['counters']['solver_checks']
+    assert {'parse', 'create_CFG', 'explore', 'solve'} <= set(stats['seconds'])
@@ -0,0 +1,53 @@
+import pytest
+
+import FrontEnd
+from advancedfuzzer import AdvancedSymbolicFuzzer
+
+SOURCE = '''
+def f(a: int, b: int):
+    if a > 0:
+        b = b + a
+    if b > 2:
+        return 1
+    if a < b:
+        return 2
+    return 0
+'''
+
+
+def fuzzer_of(**options):
+    front_end = FrontEnd.from_source(SOURCE)
+    return AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg(), **options)
+
+
+@pytest.mark.parametrize('search', ['bfs', 'dfs'])
+def test_paths_are_handed_out_as_they_are_found(search):
+    fuzzer = fuzzer_of(search=search)
+    paths = fuzzer.iter_paths(fuzzer.fnenter)
+    next(paths)
+    first = fuzzer.stats['expanded_nodes']
+    rest = list(paths)
+    assert rest and fuzzer.stats['expanded_nodes'] > first
+    fuzzer.close()
+
+
+@pytest.mark.parametrize('options', [{}, {'incremental': True}, {'slice': True}, {'model_cache': True},
+                                     {'solver_scope': 'path'}], ids=str)
+def test_results_are_solved_as_the_paths_come_in(options):
+    fuzzer = fuzzer_of(**options)
+    pulled = []
+
+    def paths():
+        for leaf in fuzzer.iter_paths(fuzzer.fnenter):
+            path = leaf.get_path_to_root()
+            constraints = fuzzer.extract_constraints(path)
+            if constraints:
+                pulled.append(constraints)
+                yield constraints, path
+
+    results = fuzzer.solve_constraints(paths())
+    for i, (constraints, (test_case, is_unsat)) in enumerate(results):
+        # a result is out before the next path is asked for
+        assert len(pulled) == i + 1 and constraints is pulled[i]
+    assert len(pulled) > 1
+    fuzzer.close()
@@ -0,0 +1,60 @@
+import ast
+
+import pytest
+import z3
+
+import FrontEnd
+from advancedfuzzer import AdvancedSymbolicFuzzer
+from HelperFunc import to_z3
+
+a, b = z3.Ints('a b')
+SYMBOLS = {'a': a, 'b': b, 'r': z3.Real('r')}
+
+SOURCE = '''
+def f(a: int, b: int):
+    a = a + 1
+    if a > b and b > 2:
+        return g(a)
+    return 0
+
+
+def g(c: int):
+    return c
+'''
+
+
+def compiled(text, sort=None):
+    return to_z3(ast.parse(text, mode='eval').body, SYMBOLS.__getitem__, sort)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('a < b + 1', a < b + 1),
+    ('0 <= a < 3', z3.And(0 <= a, a < 3)),
+    ('-a % 2 == b', -a % 2 == b),
+    ('not a != 2', z3.Not(a != 2)),
+    ('r * 2 >= a', z3.Real('r') * 2 >= z3.ToReal(a)),
+])
+def test_predicates(text, expected):
+    assert z3.eq(z3.simplify(compiled(text)), z3.simplify(expected))
+
+
+def test_calls_are_uninterpreted_in_the_sort_they_are_used_with():
+    assert compiled('g(a) > b').arg(0).decl() == z3.Function('g', z3.IntSort(), z3.IntSort())
+    assert compiled('g(a, True)').decl() == z3.Function('g', z3.IntSort(), z3.BoolSort(), z3.BoolSort())
+
+
+def test_path_constraints_are_z3_expressions():
+    front_end = FrontEnd.from_source(SOURCE)
+    fuzzer = AdvancedSymbolicFuzzer('f', front_end.src_code, front_end.cfg())
+    paths = [fuzzer.extract_constraints(leaf.get_path_to_root()) for leaf in fuzzer.iter_paths(fuzzer.fnenter)]
+    paths = [constraints for constraints in paths if constraints]
+    assert paths and all(z3.is_bool(c) for constraints in paths for c in constraints)
+    # the same predicate is the same expression on every path
+    assert len({c.get_id() for constraints in paths for c in constraints[:2]}) == 2
+    solver = z3.Solver()
+    for constraints in paths:
+        solver.push()
+        solver.add(*constraints)
+        assert solver.check() == z3.sat
+        solver.pop()
+    fuzzer.close()